@@ -0,0 +1,26 @@
+"""users keyset index
+
+Revision ID: 5d1e0c7a9b34
+Revises: bfc296086024
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e0c7a9b34'
+down_revision: Union[str, None] = 'bfc296086024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_date_created_id', 'users', ['date_created', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_date_created_id', table_name='users')
@@ -0,0 +1,35 @@
+"""users search trgm
+
+Revision ID: 9c3f4b2e7a61
+Revises: 5d1e0c7a9b34
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f4b2e7a61'
+down_revision: Union[str, None] = '5d1e0c7a9b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_users_name_trgm', 'users', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_addresses_city_trgm', 'addresses', ['city'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'})
+    op.create_index('ix_addresses_neighborhood_trgm', 'addresses', ['neighborhood'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'neighborhood': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    # pg_trgm is left installed, other objects may depend on it
+    op.drop_index('ix_addresses_neighborhood_trgm', table_name='addresses')
+    op.drop_index('ix_addresses_city_trgm', table_name='addresses')
+    op.drop_index('ix_users_name_trgm', table_name='users')
@@ -1,5 +1,7 @@
+import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from uuid import UUID
+from typing import Dict, List, Optional, Tuple
 
 from api.services.address_service import AddressService
 from api.schemas.address_schema import AddressRequestCreate, AddressResponsePublic
@@ -9,18 +11,62 @@ class AddressController:
     """
     Controller for address operations.
     """
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: Optional[AsyncSession] = None):
+        # CEP resolution never touches the database and can run without a session
         self.address_service = AddressService(session)
         
-    async def create_address_user(self, address_user:AddressRequestCreate, commit=True) -> AddressResponsePublic:
+    async def resolve_address(self, cep: int, http_client: Optional[httpx.AsyncClient] = None) -> dict:
+        """
+        Resolves the address fields for a CEP without touching the database.
+
+        Args:
+            cep (int): The CEP to resolve.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookup.
+
+        Returns:
+            dict: The state, city, neighborhood and road for the CEP.
+        """
+        return await self.address_service.resolve_address(cep, http_client=http_client)
+
+    async def resolve_ceps(self, ceps: List[int],
+                           http_client: Optional[httpx.AsyncClient] = None) -> Tuple[Dict[str, dict], Dict[str, str]]:
+        """
+        Resolves many CEPs at once.
+
+        Args:
+            ceps (List[int]): The CEPs to resolve.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookups.
+
+        Returns:
+            Tuple[Dict[str, dict], Dict[str, str]]: The resolved address fields and the error messages, keyed by CEP.
+        """
+        return await self.address_service.resolve_ceps(ceps, http_client=http_client)
+
+    async def find_public_addresses(self, user_ids: List[UUID]) -> Dict[UUID, List[AddressResponsePublic]]:
+        """
+        Loads the public addresses of many users at once.
+
+        Args:
+            user_ids (List[UUID]): The users whose addresses to load.
+
+        Returns:
+            Dict[UUID, List[AddressResponsePublic]]: The public addresses of each user.
+        """
+        return await self.address_service.find_public_addresses(user_ids)
+
+    async def create_address_user(self, address_user:AddressRequestCreate,
+                                  http_client: Optional[httpx.AsyncClient] = None,
+                                  resolved_address: Optional[dict] = None) -> AddressResponsePublic:
         """
         Creates a new address for a user.
 
         Args:
             address_user (AddressRequestCreate): The address data to be added.
-            commit (bool): Flag to commit the transaction. Defaults to True.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookup.
+            resolved_address (Optional[dict]): Address fields already resolved for the CEP.
 
         Returns:
             AddressResponsePublic: The public view of the created address, suitable for returning in API responses.
         """
-        return await self.address_service.create_address_user(address_user, commit=commit)
\ No newline at end of file
+        return await self.address_service.create_address_user(address_user, http_client=http_client,
+                                                              resolved_address=resolved_address)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,7 +9,7 @@ class AuthController:
     def __init__(self, session: AsyncSession):
         self.auth_service = AuthService(session)
         
-    async def authenticate_user(self, email: str, password: str):
-        user_id = await self.auth_service.authenticate_user(email, password)
+    async def authenticate_user(self, email: str, password: str, client_ip: Optional[str] = None):
+        user_id = await self.auth_service.authenticate_user(email, password, client_ip)
         
         return user_id
\ No newline at end of file
@@ -1,9 +1,11 @@
 import uuid
-from typing import List
+import httpx
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.services.user_service import UserService
-from api.schemas.user_schema import UserRequestCreate, UserResponsePublic
+from api.schemas.user_schema import UserRequestCreate, UserResponsePublic, UserBulkResponse
 
 
 class UserController:
@@ -14,17 +16,76 @@ class UserController:
         self.user_service = UserService(session)
      
         
-    async def create_new_user(self, data_user: UserRequestCreate) -> UserResponsePublic:
+    async def create_new_user(self, data_user: UserRequestCreate,
+                              http_client: Optional[httpx.AsyncClient] = None) -> UserResponsePublic:
         """
         Creates a new user in the database.
 
         Args:
             data_user(dict): The data for the new user.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookup.
 
         Returns:
-            User: The created user.
+            UserResponsePublic: The created user.
         """
-        return await self.user_service.create_new_user(data_user)
+        return await self.user_service.create_new_user(data_user, http_client=http_client)
+
+
+    async def create_users_bulk(self, records: List[Dict[str, Any]],
+                                http_client: Optional[httpx.AsyncClient] = None) -> UserBulkResponse:
+        """
+        Creates many users at once.
+
+        Args:
+            records (List[Dict[str, Any]]): The users, each in the UserRequestCreate format.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookups.
+
+        Returns:
+            UserBulkResponse: The outcome of each record.
+        """
+        return await self.user_service.create_users_bulk(records, http_client=http_client)
+
+
+    async def attach_addresses(self, users: List[UserResponsePublic]) -> List[UserResponsePublic]:
+        """
+        Add the public addresses to already loaded users, with one query for all of them.
+
+        Returns:
+            List[UserResponsePublic]: The users, with their addresses.
+        """
+        return await self.user_service.attach_addresses(users)
+
+
+    async def get_user_version(self, field: str, value,
+                               include_addresses: bool = False) -> Tuple[str, datetime]:
+        """
+        Retrieve the ETag and Last-Modified of a user, without loading the user.
+
+        Args:
+            field (str): The lookup field: 'id', 'cpf' or 'email'.
+            value: The value looked up.
+            include_addresses (bool): Whether the response embeds the public addresses.
+
+        Returns:
+            Tuple[str, datetime]: The ETag and the Last-Modified time.
+        """
+        return await self.user_service.get_user_version(field, value, include_addresses)
+
+
+    async def get_user_with_version(self, field: str, value,
+                                    include_addresses: bool = False) -> Tuple[UserResponsePublic, str, datetime]:
+        """
+        Retrieve a user with the ETag and Last-Modified of the response, read in one query.
+
+        Args:
+            field (str): The lookup field: 'id', 'cpf' or 'email'.
+            value: The value looked up.
+            include_addresses (bool): Whether the response embeds the public addresses.
+
+        Returns:
+            Tuple[UserResponsePublic, str, datetime]: The user, its ETag and its Last-Modified time.
+        """
+        return await self.user_service.get_user_with_version(field, value, include_addresses)
 
 
     async def get_user_by_id(self, user_id: uuid) -> UserResponsePublic:
@@ -79,4 +140,46 @@ class UserController:
         Returns:
             List[UserResponsePublic]: A list of public user data.
         """       
-        return await self.user_service.find_all_users(skip, limit, active)
\ No newline at end of file
+        return await self.user_service.find_all_users(skip, limit, active)
+
+
+    async def count_users(self, active: bool, mode: str) -> Tuple[int, str]:
+        """
+        Count the users listed by `find_all_users`.
+
+        Returns:
+            Tuple[int, str]: The total and the counting mode used.
+        """
+        return await self.user_service.count_users(active, mode)
+
+
+    async def find_users_page(self, limit: int, active: bool,
+                              cursor: Optional[str] = None) -> Tuple[List[UserResponsePublic], Optional[str]]:
+        """
+        Retrieve a page of users after the given cursor.
+
+        Returns:
+            Tuple[List[UserResponsePublic], Optional[str]]: The users and the cursor of the next page.
+        """
+        return await self.user_service.find_users_page(limit, active, cursor)
+
+
+    def export_users(self, export_format: str, include_addresses: bool) -> AsyncIterator[bytes]:
+        """
+        Stream every user as NDJSON or CSV chunks.
+
+        Returns:
+            AsyncIterator[bytes]: The chunks of the export.
+        """
+        return self.user_service.export_users(export_format, include_addresses)
+
+
+    async def search_users(self, term: str, limit: int,
+                           cursor: Optional[str] = None) -> Tuple[List[UserResponsePublic], Optional[str]]:
+        """
+        Search users by name, city or neighborhood, best matches first.
+
+        Returns:
+            Tuple[List[UserResponsePublic], Optional[str]]: The users and the cursor of the next page.
+        """
+        return await self.user_service.search_users(term, limit, cursor)
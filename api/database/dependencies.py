@@ -1,14 +1,17 @@
+import os
+import time
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
-from api.database.connection import async_session
-from fastapi import Depends, HTTPException
+from api.database.connection import async_session, async_read_session
+from fastapi import Depends, Request, Response
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from api.utils.token import verify_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/")
 
-SECRET_KEY = "123"
-ALGORITHM = "HS256"
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
 
 async def get_db():
     """
@@ -23,6 +26,55 @@ async def get_db():
         finally:
             await session.close()
             
+def mark_recent_write(response: Response) -> None:
+    """
+    Pins the client's reads to the primary for READ_YOUR_WRITES_SECONDS after a write,
+    so it does not read stale data from a lagging replica.
+
+    Args:
+        response (Response): The response of the write request.
+    """
+    response.set_cookie(READ_YOUR_WRITES_COOKIE, str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+                        max_age=READ_YOUR_WRITES_SECONDS, httponly=True)
+
+
+def reads_from_primary(request: Request) -> bool:
+    """
+    Checks whether a read must see the client's own recent writes: either the client asked for it
+    with the X-Read-Your-Writes header, or it wrote recently (see `mark_recent_write`).
+    """
+    if request.headers.get(READ_YOUR_WRITES_HEADER, '').lower() in ('1', 'true'):
+        return True
+    try:
+        return int(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_session_factory(request: Request):
+    """
+    Picks the session factory for a read: the replica, or the primary when the request
+    has to read its own writes.
+    """
+    return async_session if reads_from_primary(request) else async_read_session
+
+
+async def get_read_db(request: Request):
+    """
+    Provides a database session for read-only work.
+
+    The session is bound to the read replica (DATABASE_READ_URL) unless the request has to
+    read its own writes, in which case it is bound to the primary.
+
+    Yields:
+        AsyncSession: The database session.
+    """
+    async with read_session_factory(request)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
@@ -40,12 +92,4 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     Raises:
         HTTPException: If the token is invalid, expired, or has invalid claims.
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTClaimsError:
-        raise HTTPException(status_code=401, detail="Invalid token claims")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return verify_token(token)
@@ -0,0 +1,51 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.handlers.exceptions.database_exceptions import DataBaseTransactionException
+
+UNIT_OF_WORK_KEY = 'unit_of_work'
+
+
+class UnitOfWork:
+    """
+    Groups the writes made through one session into a single transaction.
+
+    Used as `async with UnitOfWork(session):`. The outermost unit of work commits when the
+    block ends and rolls back if it raises; units of work opened inside it, e.g. by another
+    service sharing the session, join its transaction instead of committing on their own.
+    Database errors leaving the outermost block are raised as DataBaseTransactionException.
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.outermost = False
+
+    async def __aenter__(self) -> "UnitOfWork":
+        if UNIT_OF_WORK_KEY not in self.session.info:
+            self.session.info[UNIT_OF_WORK_KEY] = self
+            self.outermost = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if not self.outermost:
+            return False
+        try:
+            if exc_type is None:
+                await self.session.commit()
+                return False
+        except SQLAlchemyError as error:
+            await self.session.rollback()
+            raise DataBaseTransactionException(error) from error
+        finally:
+            self.session.info.pop(UNIT_OF_WORK_KEY, None)
+
+        await self.session.rollback()
+        if isinstance(exc, SQLAlchemyError):
+            raise DataBaseTransactionException(exc) from exc
+        return False
+
+    async def flush(self) -> None:
+        """
+        Sends the pending changes without committing, so generated keys and server defaults
+        (fetched with INSERT ... RETURNING) become available.
+        """
+        await self.session.flush()
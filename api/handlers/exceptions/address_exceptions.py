@@ -0,0 +1,9 @@
+from fastapi import HTTPException, status
+
+class CepNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="CEP Code Not Found")
+
+class CepServiceUnavailableException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Failed to access the CEP service")
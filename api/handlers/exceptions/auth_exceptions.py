@@ -3,3 +3,9 @@ from fastapi import HTTPException, status
 class InvalidCredentialsException(HTTPException):
     def __init__(self):
         super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+
+class TooManyLoginAttemptsException(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                         detail="Too many failed login attempts, try again later",
+                         headers={"Retry-After": str(max(1, int(retry_after)))})
@@ -7,4 +7,7 @@ class UserNotFoundException(HTTPException):
 class UserAlreadyExistsException(HTTPException):
     def __init__(self, detail: str):
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
-    
\ No newline at end of file
+    
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
@@ -1,15 +1,41 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, status
+from fastapi.responses import ORJSONResponse
 
 from api.routers.user_router import router as user_router
 from api.routers.auth_router import router as auth_router
+from api.routers.address_router import router as address_router
+from api.routers.metrics_router import router as metrics_router
+from api.utils.http_client import get_http_client, close_http_client
+from api.utils.crypt_password import shutdown_hash_executor
+from api.utils.password_policy import calibrate_password_policy
+from api.utils.last_login_buffer import last_login_buffer
 
-app = FastAPI(title="Web Book Trade")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens shared resources on startup and releases them on shutdown.
+    """
+    app.state.http_client = get_http_client()
+    await asyncio.to_thread(calibrate_password_policy)
+    last_login_buffer.start()
+    yield
+    await last_login_buffer.stop()
+    await close_http_client()
+    shutdown_hash_executor()
+
+
+app = FastAPI(title="Web Book Trade", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(user_router, prefix='/users')
 app.include_router(auth_router, prefix='/auth')
+app.include_router(address_router, prefix='/addresses')
+app.include_router(metrics_router, prefix='/metrics')
 
 
 @app.get("/", status_code=status.HTTP_200_OK, summary=['main'])
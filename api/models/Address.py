@@ -2,12 +2,21 @@ import uuid
 import enum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, Integer, ForeignKey
+from sqlalchemy import String, Boolean, Integer, ForeignKey, Index, DateTime, func
+from datetime import datetime
 
 from api.database.connection import Base
 
 class Address(Base):
     __tablename__ = "addresses"
+    # server-generated values come back with INSERT ... RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    # typo-tolerant search of users by city and neighborhood
+    __table_args__ = (
+        Index('ix_addresses_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
+        Index('ix_addresses_neighborhood_trgm', 'neighborhood', postgresql_using='gin',
+              postgresql_ops={'neighborhood': 'gin_trgm_ops'}),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True, default=uuid.uuid4)
     id: Mapped[int] = mapped_column(Integer(), primary_key=True, autoincrement=True)
@@ -18,6 +27,8 @@ class Address(Base):
     road: Mapped[str] = mapped_column(String(50), nullable=True)
     number: Mapped[str] = mapped_column(String(10), nullable=True)
     public: Mapped[bool] = mapped_column(Boolean(), nullable=False, default=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(),
+                                                 onupdate=func.now())
     
     user = relationship("User", back_populates="addresses")
     
@@ -1,7 +1,7 @@
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, Date, DateTime, func
+from sqlalchemy import String, Boolean, Date, DateTime, Index, func
 from datetime import datetime, date
 
 from api.database.connection import Base
@@ -9,6 +9,14 @@ from api.database.connection import Base
 
 class User(Base):
     __tablename__ = "users"
+    # server-generated values come back with INSERT ... RETURNING instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    # backs the keyset pagination ordered by (date_created, id)
+    __table_args__ = (
+        Index('ix_users_date_created_id', 'date_created', 'id'),
+        # typo-tolerant search by name
+        Index('ix_users_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     cpf: Mapped[str] = mapped_column(String(11), nullable=False, index=True, unique=True)
@@ -23,5 +31,8 @@ class User(Base):
     notification_whats: Mapped[bool] = mapped_column(Boolean, default=True)
     date_created: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
     date_login: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    # bumped by every UPDATE, last-login flushes included; backs the ETag of user responses
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(),
+                                                 onupdate=func.now())
     
     addresses = relationship("Address", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,37 @@
+import httpx
+from fastapi import APIRouter, status
+from fastapi import Depends
+
+from api.utils.http_client import get_http_client
+from api.schemas.address_schema import CepBatchRequest, CepBatchResponse, CepAddressResponse
+from api.controllers.address_controller import AddressController
+
+router = APIRouter()
+
+@router.post('/ceps/resolve',
+             response_model=CepBatchResponse,
+             status_code=status.HTTP_200_OK,
+             summary='Resolve many CEPs',
+             tags=['addresses'])
+async def resolve_ceps(data: CepBatchRequest,
+                       http_client: httpx.AsyncClient = Depends(get_http_client)
+                       ) -> CepBatchResponse:
+    """
+    Resolve a batch of CEPs to their addresses.
+
+    Duplicated CEPs are resolved once and lookups run concurrently. CEPs that cannot be
+    resolved are reported in `errors` while the others are still returned.
+
+    Args:
+        data (CepBatchRequest): The CEPs to resolve.
+        http_client: Shared pooled HTTP client used for the CEP lookups.
+
+    Returns:
+        CepBatchResponse: The resolved addresses and the per-CEP errors.
+    """
+    address_controller = AddressController()
+    results, errors = await address_controller.resolve_ceps(data.ceps, http_client=http_client)
+    return CepBatchResponse(
+        results=[CepAddressResponse(cep=cep, **address) for cep, address in results.items()],
+        errors=errors,
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.database.dependencies import get_current_user
@@ -10,22 +10,25 @@ from api.utils.token import create_access_token
 router = APIRouter()
 
 @router.post("/", response_model=TokenResponse, status_code=status.HTTP_200_OK, summary="User Login", tags=["auth"])
-async def authenticate(data: TokenRequest, db: AsyncSession = Depends(get_db)) -> TokenResponse:
+async def authenticate(data: TokenRequest, request: Request, db: AsyncSession = Depends(get_db)) -> TokenResponse:
     """
     Authenticate a user and return a JWT token.
 
     Args:
         user (TokenRequest): The user login credentials.
+        request (Request): The incoming request, used for the client address.
         db (AsyncSession): The database session.
 
     Returns:
         TokenResponse: The access token and its type.
 
     Raises:
+        TooManyLoginAttemptsException: If there were too many failed attempts for the email or client address.
         InvalidCredentialsException: If the email or password is incorrect.
     """    
     auth_controller = AuthController(db)
-    user_id = await auth_controller.authenticate_user(data.email, data.password)
+    client_ip = request.client.host if request.client else None
+    user_id = await auth_controller.authenticate_user(data.email, data.password, client_ip)
     access_token = create_access_token(user_id=user_id)
     return TokenResponse(access_token=access_token, token_type="bearer")
 
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, status
+
+from api.database.connection import pool_stats, statement_cache_stats
+from api.utils.validate_cep import cep_cache, cep_resolver
+from api.utils.crypt_password import hash_pool_stats
+from api.utils.password_policy import password_policy
+from api.utils.login_throttle import login_throttle
+from api.utils.token import token_verifier
+from api.utils.last_login_buffer import last_login_buffer
+from api.utils.user_count_cache import user_count_cache
+from api.utils.user_version_cache import user_version_cache
+
+router = APIRouter()
+
+@router.get("/", status_code=status.HTTP_200_OK, summary="Runtime metrics", tags=["metrics"])
+async def get_metrics() -> dict:
+    """
+    Return in-process runtime counters for this worker.
+
+    Returns:
+        dict: Counters grouped by component.
+    """
+    return {
+        "database_pool": pool_stats(),
+        "statement_cache": statement_cache_stats(),
+        "cep_cache": cep_cache.stats(),
+        "cep_providers": cep_resolver.stats(),
+        "password_hashing": hash_pool_stats.as_dict(),
+        "password_policy": password_policy.describe(),
+        "login_throttle": login_throttle.stats(),
+        "token_cache": token_verifier.stats(),
+        "last_login_buffer": last_login_buffer.stats(),
+        "user_count": user_count_cache.stats(),
+        "user_versions": user_version_cache.stats(),
+    }
@@ -1,28 +1,68 @@
+import httpx
 from uuid import UUID
-from typing import List, Optional
-from fastapi import APIRouter, status
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.database.dependencies import get_db
-from api.schemas.user_schema import UserRequestCreate, UserResponsePublic
+from api.database.dependencies import get_current_user, get_db, get_read_db, mark_recent_write, read_session_factory
+from api.utils.http_client import get_http_client
+from api.utils.conditional import is_conditional, is_not_modified, not_modified_response, validator_headers
+from api.schemas.user_schema import UserRequestCreate, UserResponsePublic, UserPageResponse, UserBulkRequest, UserBulkResponse
 from api.controllers.user_controller import UserController
 
 router = APIRouter()
 
+TOTAL_COUNT_HEADER = 'X-Total-Count'
+TOTAL_COUNT_MODE_HEADER = 'X-Total-Count-Mode'
+# `addresses` is only set, and so only serialized, when include=addresses is asked for
+Include = Optional[Literal['addresses']]
+
+
+async def find_user(request: Request, response: Response, user_controller: UserController, field: str, value,
+                    include: Include):
+    """
+    Serves a GET of a single user, answering revalidations with a 304 when the client's copy is current.
+
+    Only conditional requests read the version on its own, from the version cache. A full response
+    reads the user and its validators with one query, so they always describe the body sent.
+
+    Returns:
+        UserResponsePublic | Response: The user, with the ETag and Last-Modified set on `response`,
+        or a 304 response.
+    """
+    include_addresses = include == 'addresses'
+    if is_conditional(request):
+        etag, last_modified = await user_controller.get_user_version(field, value, include_addresses)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+    user, etag, last_modified = await user_controller.get_user_with_version(field, value, include_addresses)
+    if include_addresses:
+        await user_controller.attach_addresses([user])
+    response.headers.update(validator_headers(etag, last_modified))
+    return user
+
+
 @router.post('/',
              response_model=UserResponsePublic,
+             response_model_exclude_unset=True,
              status_code=status.HTTP_201_CREATED,
              summary='Create new user',
              tags=['users'])
 async def create_new_user(data_user: UserRequestCreate, 
-                          db: AsyncSession = Depends(get_db)
+                          response: Response,
+                          db: AsyncSession = Depends(get_db),
+                          http_client: httpx.AsyncClient = Depends(get_http_client)
                           ) -> UserResponsePublic:
     """ Create a new user.
 
     Args:
         user (UserRequest): The user data to create.
+        response (Response): The response, used to pin the client's next reads to the primary.
         db: Session Depends
+        http_client: Shared pooled HTTP client used for the CEP lookup.
 
     Returns:
         UserResponse: The created user.
@@ -32,17 +72,168 @@ async def create_new_user(data_user: UserRequestCreate,
         HTTPException: If there is a database transaction error.
     """
     user_controller = UserController(db)
-    new_user = await user_controller.create_new_user(data_user)
-    return UserResponsePublic.model_validate(new_user.__dict__)
+    new_user = await user_controller.create_new_user(data_user, http_client=http_client)
+    mark_recent_write(response)
+    return new_user
     
 
+@router.post('/bulk',
+             response_model=UserBulkResponse,
+             status_code=status.HTTP_200_OK,
+             summary='Create many users',
+             tags=['users'])
+async def create_users_bulk(data_users: UserBulkRequest,
+                            response: Response,
+                            db: AsyncSession = Depends(get_db),
+                            http_client: httpx.AsyncClient = Depends(get_http_client)
+                            ) -> UserBulkResponse:
+    """ Create many users in one request, e.g. to import a partner's user base.
+
+    Records that are invalid, duplicated or have an unknown CEP are skipped and reported;
+    the others are created.
+
+    Args:
+        data_users (UserBulkRequest): The users to create.
+        response (Response): The response, used to pin the client's next reads to the primary.
+        db: Session Depends
+        http_client: Shared pooled HTTP client used for the CEP lookups.
+
+    Returns:
+        UserBulkResponse: The outcome of each record, in request order.
+
+    Raises:
+        HTTPException: If an insert conflicts with a user that can no longer be found.
+        HTTPException: If there is a database transaction error.
+    """
+    user_controller = UserController(db)
+    report = await user_controller.create_users_bulk(data_users.users, http_client=http_client)
+    if report.created:
+        mark_recent_write(response)
+    return report
+
+
+@router.get('/page',
+            response_model=UserPageResponse,
+            response_model_exclude_unset=True,
+            status_code=status.HTTP_200_OK,
+            summary='Get a page of users',
+            tags=['users'])
+async def find_users_page(cursor: Optional[str] = None,
+                          limit: int = Query(10, ge=1, le=100),
+                          active: bool = True,
+                          include: Include = None,
+                          db: AsyncSession = Depends(get_read_db)
+                          ) -> UserPageResponse:
+    """Retrieve users with cursor pagination, ordered by creation date.
+
+    Args:
+        cursor (Optional[str]): The `next_cursor` of the previous page. Omit it for the first page.
+        limit (int, optional): Maximum number of users in the page, up to 100.
+        active (Optional[bool], optional): Filter by active users.
+        include (Optional[str], optional): 'addresses' to embed the user's public addresses.
+        db (AsyncSession, optional): The read-only database session dependency.
+
+    Returns:
+        UserPageResponse: The users and the cursor of the next page, null on the last page.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    user_controller = UserController(db)
+    users, next_cursor = await user_controller.find_users_page(limit, active, cursor)
+    if include == 'addresses':
+        await user_controller.attach_addresses(users)
+    return UserPageResponse(items=users, next_cursor=next_cursor)
+
+
+@router.get('/search',
+            response_model=UserPageResponse,
+            response_model_exclude_unset=True,
+            status_code=status.HTTP_200_OK,
+            summary='Search users',
+            tags=['users'])
+async def search_users(q: str = Query(..., min_length=3, max_length=100),
+                       cursor: Optional[str] = None,
+                       limit: int = Query(10, ge=1, le=100),
+                       include: Include = None,
+                       db: AsyncSession = Depends(get_read_db)
+                       ) -> UserPageResponse:
+    """Search users by name, or by the city or neighborhood of their public addresses.
+
+    Matching is typo tolerant and results are ranked by similarity, best first.
+
+    Args:
+        q (str): The text to look for, at least 3 characters.
+        cursor (Optional[str]): The `next_cursor` of the previous page. Omit it for the first page.
+        limit (int, optional): Maximum number of users in the page, up to 100.
+        include (Optional[str], optional): 'addresses' to embed the user's public addresses.
+        db (AsyncSession, optional): The read-only database session dependency.
+
+    Returns:
+        UserPageResponse: The users and the cursor of the next page, null on the last page.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    user_controller = UserController(db)
+    users, next_cursor = await user_controller.search_users(q, limit, cursor)
+    if include == 'addresses':
+        await user_controller.attach_addresses(users)
+    return UserPageResponse(items=users, next_cursor=next_cursor)
+
+
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+@router.get('/export',
+            response_class=StreamingResponse,
+            status_code=status.HTTP_200_OK,
+            summary='Export all users',
+            tags=['users'])
+async def export_users(request: Request,
+                       format: Literal['ndjson', 'csv'] = 'ndjson',
+                       include_addresses: bool = False,
+                       current_user: dict = Depends(get_current_user)
+                       ) -> StreamingResponse:
+    """Stream the whole user base as NDJSON or CSV.
+
+    The session is opened inside the stream, so it lives as long as the response is being
+    sent, and rows are read through a server-side cursor.
+
+    Args:
+        request (Request): The request, used to pick the replica or the primary.
+        format (str, optional): 'ndjson' (default) or 'csv'.
+        include_addresses (bool, optional): Include the users' public addresses.
+        current_user (dict): The authenticated user; the export is not open to anonymous clients.
+
+    Returns:
+        StreamingResponse: The export, sent in chunks.
+
+    Raises:
+        HTTPException: If the bearer token is missing, invalid or expired.
+    """
+    session_factory = read_session_factory(request)
+
+    async def chunks():
+        async with session_factory() as session:
+            async for chunk in UserController(session).export_users(format, include_addresses):
+                yield chunk
+
+    return StreamingResponse(chunks(), media_type=EXPORT_MEDIA_TYPES[format],
+                             headers={'Content-Disposition': f'attachment; filename="users.{format}"'})
+
+
 @router.get('/{email}/email',
             response_model=UserResponsePublic,
+            response_model_exclude_unset=True,
             status_code=status.HTTP_200_OK,
             summary='Get a user by email',
             tags=['users'])
 async def get_user_by_email(email: str,
-                          db: AsyncSession = Depends(get_db)
+                          request: Request,
+                          response: Response,
+                          include: Include = None,
+                          db: AsyncSession = Depends(get_read_db)
                           ) -> UserResponsePublic:
     """
     Retrieve a user by their email address.
@@ -51,24 +242,29 @@ async def get_user_by_email(email: str,
 
     Args:
         email (str): The email address of the user to retrieve.
-        db (AsyncSession, optional): The database session dependency.
+        request (Request): The request, checked for If-None-Match and If-Modified-Since.
+        response (Response): The response, used for the ETag and Last-Modified headers.
+        include (Optional[str], optional): 'addresses' to embed the user's public addresses.
+        db (AsyncSession, optional): The read-only database session dependency.
 
     Returns:
         UserResponsePublic: The user data corresponding to the provided email address.
     """
     user_controller = UserController(db)
-    user = await user_controller.get_user_by_email(email)
-    
-    return UserResponsePublic.model_validate(user.__dict__)
+    return await find_user(request, response, user_controller, 'email', email, include)
 
 
 @router.get('/{cpf}/cpf',
             response_model=UserResponsePublic,
+            response_model_exclude_unset=True,
             status_code=status.HTTP_200_OK,
             summary='Get a user by cpf',
             tags=['users'])
 async def get_user_by_cpf(cpf: str,
-                          db: AsyncSession = Depends(get_db)
+                          request: Request,
+                          response: Response,
+                          include: Include = None,
+                          db: AsyncSession = Depends(get_read_db)
                           ) -> UserResponsePublic:
     """
     Retrieve a user by their CPF.
@@ -77,24 +273,29 @@ async def get_user_by_cpf(cpf: str,
 
     Args:
         cpf (str): CPF of the user to retrieve.
-        db (AsyncSession, optional): The database session dependency.
+        request (Request): The request, checked for If-None-Match and If-Modified-Since.
+        response (Response): The response, used for the ETag and Last-Modified headers.
+        include (Optional[str], optional): 'addresses' to embed the user's public addresses.
+        db (AsyncSession, optional): The read-only database session dependency.
 
     Returns:
         UserResponsePublic: The user data corresponding to the provided CPF.
     """
     user_controller = UserController(db)
-    user = await user_controller.get_user_by_cpf(cpf)
-    
-    return UserResponsePublic.model_validate(user.__dict__)
+    return await find_user(request, response, user_controller, 'cpf', cpf, include)
 
 
 @router.get('/{id}/',
             response_model=UserResponsePublic,
+            response_model_exclude_unset=True,
             status_code=status.HTTP_200_OK,
             summary='Get a user by id',
             tags=['users'])
 async def get_user_by_id(id: UUID,
-                          db: AsyncSession = Depends(get_db)
+                          request: Request,
+                          response: Response,
+                          include: Include = None,
+                          db: AsyncSession = Depends(get_read_db)
                           ) -> UserResponsePublic:
     """
     Retrieve a user by their unique identifier (ID).
@@ -103,34 +304,43 @@ async def get_user_by_id(id: UUID,
 
     Args:
         id (UUID): The unique identifier of the user to retrieve.
-        db (AsyncSession, optional): The database session dependency.
+        request (Request): The request, checked for If-None-Match and If-Modified-Since.
+        response (Response): The response, used for the ETag and Last-Modified headers.
+        include (Optional[str], optional): 'addresses' to embed the user's public addresses.
+        db (AsyncSession, optional): The read-only database session dependency.
 
     Returns:
         UserResponsePublic: The user data corresponding to the provided UUID.
     """
     user_controller = UserController(db)
-    user = await user_controller.get_user_by_id(id)
-    
-    return UserResponsePublic.model_validate(user.__dict__)
+    return await find_user(request, response, user_controller, 'id', id, include)
 
 
 @router.get('/', 
             response_model=List[UserResponsePublic], 
+            response_model_exclude_unset=True,
             status_code=status.HTTP_200_OK, 
             summary='Get a list of users', 
             tags=['users'])
-async def find_all_users(skip: int = 0,
+async def find_all_users(response: Response,
+                         skip: int = 0,
                          limit: int = 10,
                          active: bool = True,
-                         db: AsyncSession = Depends(get_db)
-                         ) -> UserResponsePublic:
+                         count: Optional[Literal['exact', 'estimated']] = None,
+                         include: Include = None,
+                         db: AsyncSession = Depends(get_read_db)
+                         ) -> List[UserResponsePublic]:
     """Retrieve a list of users with pagination.
 
     Args:
         
+        response (Response): The response, used for the total count headers.
         skip (int, optional): Number of records to skip for pagination.
         limit (int, optional): Maximum number of records to return.
         active (Optional[bool], optional): Filter by active users.
+        count (Optional[str], optional): Adds X-Total-Count, 'exact' or 'estimated'. The mode actually
+            used is returned in X-Total-Count-Mode.
+        include (Optional[str], optional): 'addresses' to embed the users' public addresses.
         user_controller (UserController, optional): The user controller. Defaults to Depends().
 
     Returns:
@@ -142,4 +352,10 @@ async def find_all_users(skip: int = 0,
     
     user_controller = UserController(db)
     users = await user_controller.find_all_users(skip, limit, active)    
-    return [UserResponsePublic.model_validate(user.__dict__) for user in users]
+    if include == 'addresses':
+        await user_controller.attach_addresses(users)
+    if count is not None:
+        total, mode = await user_controller.count_users(active, count)
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+        response.headers[TOTAL_COUNT_MODE_HEADER] = mode
+    return users
@@ -1,10 +1,16 @@
+import os
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from typing import Annotated, Optional
+from typing import Annotated, Dict, List, Optional
+from dotenv import load_dotenv
 from pydantic import Field
 
 from api.schemas.base_schema import BaseSchema
 
+load_dotenv()
+
+CEP_BATCH_MAX_SIZE = int(os.getenv("CEP_BATCH_MAX_SIZE", 50000))
+
 
 class AddressRequestCreate(BaseSchema):
     user_id: uuid.UUID = Field(default_factory=uuid.uuid4, description="Unique identifier of the associated user.")
@@ -20,6 +26,22 @@ class AddressResponsePublic(BaseSchema):
     state: Annotated[str, Field(description='Two-letter state code, relevant and required if applicable.')]
     city: Annotated[str, Field(description='Name of the city, must be between 2 and 50 characters.')]
     neighborhood: Annotated[str, Field(description='Name of the neighborhood, up to 50 characters.')]
-    road: Annotated[str, Field(description='Name of the road or street, up to 50 characters.')]
-    number: Annotated[str, Field(description='House or building number, up to 10 characters.')]
-    public: Annotated[bool, Field(description='Flag to indicate if the address should be public. True for public, False for private.')]
\ No newline at end of file
+    road: Annotated[Optional[str], Field(description='Name of the road or street, up to 50 characters.')]
+    number: Annotated[Optional[str], Field(description='House or building number, up to 10 characters.')]
+    public: Annotated[bool, Field(description='Flag to indicate if the address should be public. True for public, False for private.')]
+
+class CepBatchRequest(BaseSchema):
+    ceps: Annotated[List[int], Field(..., min_length=1, max_length=CEP_BATCH_MAX_SIZE, description='CEPs to resolve, in 12345678 format. Duplicates are resolved once.')]
+
+
+class CepAddressResponse(BaseSchema):
+    cep: Annotated[str, Field(description='The CEP in 12345678 format.')]
+    state: Annotated[Optional[str], Field(description='Two-letter state code.')]
+    city: Annotated[Optional[str], Field(description='Name of the city.')]
+    neighborhood: Annotated[Optional[str], Field(description='Name of the neighborhood.')]
+    road: Annotated[Optional[str], Field(description='Name of the road or street.')]
+
+
+class CepBatchResponse(BaseSchema):
+    results: Annotated[List[CepAddressResponse], Field(description='Addresses of the CEPs that were resolved.')]
+    errors: Annotated[Dict[str, str], Field(description='Error message for each CEP that could not be resolved, keyed by CEP.')]
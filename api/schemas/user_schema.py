@@ -1,10 +1,18 @@
+import os
 import uuid
-from typing import Annotated, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional
+from dotenv import load_dotenv
 from typing import Optional
 from pydantic import Field, EmailStr
 from datetime import datetime, date
 
 from api.schemas.base_schema import BaseSchema
+from api.schemas.address_schema import AddressResponsePublic
+
+load_dotenv()
+
+USER_BULK_MAX_SIZE = int(os.getenv("USER_BULK_MAX_SIZE", 5000))
+
 
 class UserRequestCreate(BaseSchema):
     cpf: Annotated[str, Field(..., min_length=11, max_length=11, description='CPF must be exactly 11 characters.')]
@@ -31,4 +39,27 @@ class UserResponsePublic(BaseSchema):
     date_birth: Annotated[datetime, Field(description="The date of birth of the user.")]
     active: Annotated[bool, Field(description="Whether the user's account is active.")]
     date_created: Annotated[datetime, Field(description="The date and time when the user's account was created.")]
-    date_login: Annotated[Optional[datetime], Field(description="The last date and time the user logged in, may be null.")]
\ No newline at end of file
+    date_login: Annotated[Optional[datetime], Field(description="The last date and time the user logged in, may be null.")]
+    addresses: Annotated[Optional[List[AddressResponsePublic]], Field(description="The user's public addresses, only present when requested with include=addresses.")] = None
+
+
+class UserPageResponse(BaseSchema):
+    items: Annotated[List[UserResponsePublic], Field(description="The users of this page.")]
+    next_cursor: Annotated[Optional[str], Field(description="Cursor of the next page, null on the last page.")] = None
+
+
+class UserBulkRequest(BaseSchema):
+    users: Annotated[List[Dict[str, Any]], Field(..., min_length=1, max_length=USER_BULK_MAX_SIZE, description='Users to create, each in the UserRequestCreate format. Each one is validated on its own.')]
+
+
+class UserBulkResult(BaseSchema):
+    index: Annotated[int, Field(description="Position of the record in the request.")]
+    status: Annotated[Literal['created', 'invalid', 'duplicate', 'cep_error'], Field(description="Outcome of the record.")]
+    id: Annotated[Optional[uuid.UUID], Field(description="Id of the created user.")] = None
+    detail: Annotated[Optional[Any], Field(description="Why the record was not created.")] = None
+
+
+class UserBulkResponse(BaseSchema):
+    created: Annotated[int, Field(description="Number of users created.")]
+    failed: Annotated[int, Field(description="Number of records rejected.")]
+    results: Annotated[List[UserBulkResult], Field(description="One result per record, in request order.")]
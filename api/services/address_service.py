@@ -1,50 +1,146 @@
+import httpx
+import asyncio
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from uuid import UUID
 
-from api.utils.validate_cep import validate_cep
+from api.utils.validate_cep import validate_cep, normalize_cep, CepNotFoundError, CepServiceError, CEP_BATCH_CONCURRENCY
 from api.models.Address import Address
 from api.schemas.address_schema import AddressRequestCreate, AddressResponsePublic
-from api.handlers.exceptions.database_exceptions import DataBaseTransactionException
+from api.database.unit_of_work import UnitOfWork
+from api.handlers.exceptions.address_exceptions import CepNotFoundException, CepServiceUnavailableException
 from sqlalchemy.exc import SQLAlchemyError
 
+PUBLIC_ADDRESS_COLUMNS = tuple(getattr(Address, field) for field in AddressResponsePublic.model_fields)
+
 class AddressService:
     """
     Service layer for handling user data operations.
     """
-    def __init__(self, session:AsyncSession):
+    def __init__(self, session: Optional[AsyncSession] = None):
         self.session = session
-        
-    async def create_address_user(self, address_data: AddressRequestCreate, commit=True) -> AddressResponsePublic:
+
+    async def resolve_address(self, cep: int, http_client: Optional[httpx.AsyncClient] = None) -> dict:
+        """
+        Resolves the address fields for a CEP without touching the database.
+
+        Call it before the first statement of a transaction so no pooled connection is held
+        during the CEP lookup.
+
+        Args:
+            cep (int): The CEP to resolve.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookup. Defaults to the shared client.
+
+        Returns:
+            dict: The state, city, neighborhood and road for the CEP.
+
+        Raises:
+            CepNotFoundException: If the CEP does not exist.
+            CepServiceUnavailableException: If the CEP service could not be reached.
+        """
+        try:
+            data_cep = await validate_cep(cep, client=http_client)
+        except CepNotFoundError:
+            raise CepNotFoundException()
+        except CepServiceError:
+            raise CepServiceUnavailableException()
+
+        return {
+            'state': data_cep['uf'],
+            'city': data_cep['localidade'],
+            'neighborhood': data_cep['bairro'],
+            'road': data_cep['logradouro'],
+        }
+
+    async def resolve_ceps(self, ceps: List[int], http_client: Optional[httpx.AsyncClient] = None,
+                           concurrency: int = CEP_BATCH_CONCURRENCY) -> Tuple[Dict[str, dict], Dict[str, str]]:
+        """
+        Resolves many CEPs at once without touching the database.
+
+        CEPs are deduplicated and looked up concurrently, at most `concurrency` at a time.
+        A CEP that fails does not fail the batch; its error is reported instead.
+
+        Args:
+            ceps (List[int]): The CEPs to resolve.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookups. Defaults to the shared client.
+            concurrency (int): Maximum number of lookups in flight. Defaults to CEP_BATCH_CONCURRENCY.
+
+        Returns:
+            Tuple[Dict[str, dict], Dict[str, str]]: The resolved address fields and the error messages, both keyed by normalized CEP.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        results: Dict[str, dict] = {}
+        errors: Dict[str, str] = {}
+
+        async def resolve(cep: str) -> None:
+            async with semaphore:
+                try:
+                    results[cep] = await self.resolve_address(cep, http_client=http_client)
+                except (CepNotFoundException, CepServiceUnavailableException) as error:
+                    errors[cep] = error.detail
+
+        await asyncio.gather(*(resolve(cep) for cep in dict.fromkeys(normalize_cep(cep) for cep in ceps)))
+        return results, errors
+
+    async def find_public_addresses(self, user_ids: List[UUID]) -> Dict[UUID, List[AddressResponsePublic]]:
+        """
+        Loads the public addresses of many users with a single query.
+
+        Private addresses (public=False) are filtered out in SQL and never leave the database.
+
+        Args:
+            user_ids (List[UUID]): The users whose addresses to load.
+
+        Returns:
+            Dict[UUID, List[AddressResponsePublic]]: The addresses of each user, users without any included with an empty list.
+        """
+        addresses: Dict[UUID, List[AddressResponsePublic]] = {user_id: [] for user_id in user_ids}
+        if not addresses:
+            return addresses
+
+        result = await self.session.execute(
+            select(*PUBLIC_ADDRESS_COLUMNS)
+            .where(Address.user_id.in_(list(addresses)), Address.public.is_(True))
+            .order_by(Address.user_id, Address.id)
+        )
+        for row in result:
+            addresses[row.user_id].append(AddressResponsePublic.model_validate(row._asdict()))
+        return addresses
+
+    async def create_address_user(self, address_data: AddressRequestCreate,
+                                  http_client: Optional[httpx.AsyncClient] = None,
+                                  resolved_address: Optional[dict] = None) -> AddressResponsePublic:
         """
         Handles the creation of a new address entry in the database.
 
+        The address is written inside a unit of work, so when the caller already opened one
+        (as user signup does) it joins that transaction instead of committing on its own.
+
         Args:
             address_data (AddressRequestCreate): The data required to create a new address.
-            commit (bool): If True, commits the transaction after adding the address. Defaults to True.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookup. Defaults to the shared client.
+            resolved_address (Optional[dict]): Address fields already obtained from `resolve_address`. Skips the CEP lookup.
 
         Returns:
             AddressResponsePublic: Data representation of the newly created address suitable for API responses.
 
         Raises:
+            CepNotFoundException: If the CEP does not exist.
+            CepServiceUnavailableException: If the CEP service could not be reached.
             DataBaseTransactionException: If there is an issue during the database transaction.
         """
-        address_data = address_data.model_dump()        
+        address_data = address_data.model_dump()
 
-        data_cep = await validate_cep(address_data['cep'])        
-        address_data['state'] = data_cep['uf']
-        address_data['city'] = data_cep['localidade']
-        address_data['neighborhood'] = data_cep['bairro']
-        address_data['road'] = data_cep['logradouro']
+        if resolved_address is None:
+            resolved_address = await self.resolve_address(address_data['cep'], http_client=http_client)
+        address_data.update(resolved_address)
 
         new_address = Address(**address_data)
-        
-        try:
+
+        async with UnitOfWork(self.session) as unit_of_work:
             self.session.add(new_address)
-            if commit == True:                
-                await self.session.commit()
-            await self.session.refresh(new_address)
-        except Exception:
-            await self.session.rollback()
-            raise DataBaseTransactionException(Exception)
-
-        return new_address
\ No newline at end of file
+            # the generated id comes back through INSERT ... RETURNING, no refresh needed
+            await unit_of_work.flush()
+
+        return new_address
@@ -1,43 +1,59 @@
-from datetime import datetime
+from typing import Optional
+from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import lambda_stmt
 from sqlalchemy.future import select
 
 from api.models.User import User
-from api.utils.crypt_password import verify_password
-from api.handlers.exceptions.auth_exceptions import InvalidCredentialsException
-from api.handlers.exceptions.database_exceptions import DataBaseTransactionException
+from api.database.unit_of_work import UnitOfWork
+from api.utils.crypt_password import verify_password_async, has_password_async
+from api.utils.password_policy import password_policy
+from api.utils.login_throttle import login_throttle
+from api.utils.last_login_buffer import last_login_buffer
+from api.handlers.exceptions.auth_exceptions import InvalidCredentialsException, TooManyLoginAttemptsException
 
 class AuthService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def authenticate_user(self, email: str, password: str):
+    async def authenticate_user(self, email: str, password: str, client_ip: Optional[str] = None):
         """
         Authenticates a user by email and password.
 
+        A stored hash that does not match the current password policy is transparently
+        replaced by one that does. Emails and client IPs with too many recent failures
+        are rejected before the database is queried or the password checked.
+
         Args:
             email (str): The user's email.
             password (str): The user's password.
+            client_ip (Optional[str]): The address the attempt comes from.
 
         Raises:
+            TooManyLoginAttemptsException: If the email or client IP is locked out.
             InvalidCredentialsException: If the credentials are invalid.
         """
+        retry_after = login_throttle.check(email, client_ip)
+        if retry_after is not None:
+            raise TooManyLoginAttemptsException(retry_after)
+
         try:
-            stmt = select(User).filter(User.email == email)
+            stmt = lambda_stmt(lambda: select(User).where(User.email == email))
             result = await self.session.execute(stmt)
             user = result.scalars().first()
             
-            if user and verify_password(password, user.password):               
-                date_time = datetime.now()
-                try:
-                    user.date_login = date_time
-                    await self.session.commit()
-                    await self.session.refresh(user)
-                except Exception:
-                    await self.session.rollback()
-                    raise DataBaseTransactionException(Exception)
+            if user and await verify_password_async(password, user.password):               
+                # written behind in bulk instead of an UPDATE and commit per login
+                last_login_buffer.record(user.id, datetime.now(timezone.utc))
+                if password_policy.needs_rehash(user.password):
+                    # upgrade hashes made under an older scheme or work factor while we know the password
+                    new_hash = await has_password_async(password)
+                    async with UnitOfWork(self.session):
+                        user.password = new_hash
+                login_throttle.record_success(email)
                 return user.id
             else:
+                login_throttle.record_failure(email, client_ip)
                 raise InvalidCredentialsException
             
         except InvalidCredentialsException:
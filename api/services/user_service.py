@@ -1,65 +1,299 @@
-from typing import List
+import io
+import os
+import re
+import csv
+import json
+import asyncio
+import hashlib
+from uuid import UUID, uuid4
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
+
+import httpx
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy import and_, exists, func, insert, lambda_stmt, literal, or_, text, tuple_, union_all
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from api.models.User import User
+from api.models.Address import Address
+from api.database.unit_of_work import UnitOfWork
 from api.controllers.address_controller import AddressController
-from api.schemas.user_schema import UserRequestCreate, UserResponsePublic
+from api.schemas.user_schema import UserRequestCreate, UserResponsePublic, UserBulkResult, UserBulkResponse
 from api.schemas.address_schema import AddressRequestCreate
-from api.utils.crypt_password import has_password
-from api.handlers.exceptions.user_exceptions import UserAlreadyExistsException, UserNotFoundException
+from api.utils.crypt_password import has_password_async
+from api.utils.cursor import encode_cursor, decode_cursor
+from api.utils.last_login_buffer import last_login_buffer
+from api.utils.user_count_cache import user_count_cache
+from api.utils.user_version_cache import user_version_cache
+from api.utils.validate_cep import normalize_cep
+from api.handlers.exceptions.user_exceptions import UserAlreadyExistsException, UserNotFoundException, InvalidCursorException
+from api.handlers.exceptions.address_exceptions import CepNotFoundException, CepServiceUnavailableException
 from api.handlers.exceptions.database_exceptions import DataBaseTransactionException
 
+load_dotenv()
+
+USER_EXPORT_CHUNK_SIZE = int(os.getenv("USER_EXPORT_CHUNK_SIZE", 65536))
+USER_EXPORT_BATCH_SIZE = int(os.getenv("USER_EXPORT_BATCH_SIZE", 1000))
+USER_BULK_INSERT_BATCH_SIZE = int(os.getenv("USER_BULK_INSERT_BATCH_SIZE", 1000))
+
+# unique constraints on users, in the order conflicts are reported
+USER_UNIQUE_CONSTRAINTS = {
+    'ix_users_cpf': ('cpf', "User with this cpf already exists."),
+    'ix_users_email': ('email', "User with this email already exists."),
+    'users_whatsapp_key': ('whatsapp', "User with this whastapp already exists."),
+}
+
+# only the columns the public view needs, so reads skip the password hash and ORM hydration
+PUBLIC_USER_FIELDS = tuple(field for field in UserResponsePublic.model_fields if field != 'addresses')
+PUBLIC_USER_COLUMNS = tuple(getattr(User, field) for field in PUBLIC_USER_FIELDS)
+
+# lookups the single-user endpoints are served by
+USER_LOOKUP_COLUMNS = {'id': User.id, 'cpf': User.cpf, 'email': User.email}
+
+# address columns included in exports, labelled address_<column> in the result rows
+EXPORT_ADDRESS_COLUMNS = (Address.cep, Address.state, Address.city, Address.neighborhood,
+                          Address.road, Address.number)
+
 class UserService:
     """
     Service layer for handling user data operations.
     """
     def __init__(self, session:AsyncSession):
         self.session = session
+
+
+    @staticmethod
+    def to_public(row) -> UserResponsePublic:
+        """
+        Builds the public view of a user straight from a row of PUBLIC_USER_COLUMNS, overlaying
+        a login still waiting in the write-behind buffer.
+        """
+        data = row._asdict()
+        pending = last_login_buffer.get(data['id'])
+        if pending is not None and (data['date_login'] is None or pending > data['date_login']):
+            data['date_login'] = pending
+        return UserResponsePublic.model_validate(data)
       
         
-    async def create_new_user(self, data_user: UserRequestCreate) -> UserResponsePublic:
+    async def create_new_user(self, data_user: UserRequestCreate,
+                              http_client: Optional[httpx.AsyncClient] = None) -> UserResponsePublic:
         """
         Creates a new user in the database.
 
         Args:
             data_user(dict): The data for the new user.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookup.
 
         Returns:
-            User: The created user.
+            UserResponsePublic: The created user.
 
         Raises:
+            CepNotFoundException: If the CEP does not exist.
+            CepServiceUnavailableException: If the CEP service could not be reached.
             UserAlreadyExistsException: If a user with the given CPF or email already exists.
             DataBaseTransactionException: If there is an error during the database transaction.
         """
         user_data = data_user.model_dump(exclude={'cep', 'number', 'public'})        
-        await self.check_user_exists(user_data['cpf'], user_data['email'], user_data['whatsapp'])
-        
-        hashed_password = has_password(user_data['password'])
+        address_controller = AddressController(self.session)
+
+        # The CEP lookup and the password hash run before the first statement autobegins the
+        # transaction, so no pooled connection is held open while they run.
+        try:
+            resolved_address = await address_controller.resolve_address(data_user.cep, http_client=http_client)
+        except (CepNotFoundException, CepServiceUnavailableException):
+            # a duplicate user is still reported ahead of a bad CEP; the check only runs on this path
+            await self.check_user_exists(user_data['cpf'], user_data['email'], user_data['whatsapp'])
+            raise
+        hashed_password = await has_password_async(user_data['password'])
         user_data['password'] = hashed_password
         user_data['date_created'] = datetime.now(timezone.utc)
-        
-        try:
-            new_user = User(**user_data) 
+        # a new user has never logged in; set it here so the column is loaded without a refresh
+        user_data['date_login'] = None
+
+        async with UnitOfWork(self.session) as unit_of_work:
+            # insert first and let the unique constraints report a duplicate, instead of checking
+            # each key with its own SELECT beforehand
+            new_user = User(**user_data)
             self.session.add(new_user)
-            await self.session.flush()
+            try:
+                await unit_of_work.flush()
+            except IntegrityError as error:
+                raise self.user_conflict(error)
+
             address_data = data_user.model_dump(include={'cep', 'number', 'public'})
             address_data['user_id'] = new_user.id
-            
             address_data = AddressRequestCreate(**address_data)
-            address_controller = AddressController(self.session)         
-            
-            await address_controller.create_address_user(address_data, commit=True)      
-            await self.session.commit()
-            await self.session.refresh(new_user)
-        except Exception:
-            await self.session.rollback()
-            raise DataBaseTransactionException(Exception)
-        
-        return new_user
+
+            # joins this unit of work, so user and address are committed together, once
+            await address_controller.create_address_user(address_data, resolved_address=resolved_address)
+
+        # built from the loaded columns only; the addresses relationship would lazy-load
+        return UserResponsePublic.model_validate({field: getattr(new_user, field) for field in PUBLIC_USER_FIELDS})
             
         
+    async def create_users_bulk(self, records: List[Dict[str, Any]],
+                                http_client: Optional[httpx.AsyncClient] = None) -> UserBulkResponse:
+        """
+        Creates many users at once and reports the outcome of each record.
+
+        Records are validated one by one, duplicates (within the batch and against the
+        database) are found with a single query, CEPs are resolved once each and concurrently,
+        passwords are hashed in parallel on the hashing pool, and users and addresses are
+        inserted in batches of USER_BULK_INSERT_BATCH_SIZE rows in one transaction. Records
+        colliding with a user created concurrently are reported as duplicates and the rest
+        inserted again.
+
+        Args:
+            records (List[Dict[str, Any]]): The users, each in the UserRequestCreate format.
+            http_client (Optional[httpx.AsyncClient]): Pooled HTTP client used for the CEP lookups.
+
+        Returns:
+            UserBulkResponse: One result per record, in request order.
+
+        Raises:
+            UserAlreadyExistsException: If an insert conflicts with a user that can no longer be found.
+            DataBaseTransactionException: If there is an error during the database transaction.
+        """
+        results: Dict[int, UserBulkResult] = {}
+        pending: Dict[int, UserRequestCreate] = {}
+
+        for index, record in enumerate(records):
+            try:
+                pending[index] = UserRequestCreate.model_validate(record)
+            except ValidationError as error:
+                results[index] = UserBulkResult(index=index, status='invalid',
+                                                detail=error.errors(include_url=False, include_context=False, include_input=False))
+
+        messages = {key: message for key, message in USER_UNIQUE_CONSTRAINTS.values()}
+        taken = await self.find_taken_keys(pending.values())
+        # the check above is read-only; end its transaction so no connection is held while hashing
+        await self.session.rollback()
+
+        def user_keys(data_user: UserRequestCreate) -> Dict[str, Optional[str]]:
+            return {'cpf': data_user.cpf, 'email': data_user.email, 'whatsapp': data_user.whatsapp}
+
+        def reject_duplicates(reserve: bool) -> None:
+            for index, data_user in list(pending.items()):
+                keys = user_keys(data_user)
+                conflict = next((key for key, value in keys.items() if value is not None and value in taken[key]), None)
+                if conflict is not None:
+                    results[index] = UserBulkResult(index=index, status='duplicate', detail=messages[conflict])
+                    del pending[index]
+                elif reserve:
+                    for key, value in keys.items():
+                        if value is not None:
+                            taken[key].add(value)
+
+        # users that already exist are dropped before their CEPs are looked up
+        reject_duplicates(reserve=False)
+
+        address_controller = AddressController(self.session)
+        resolved, cep_errors = await address_controller.resolve_ceps(
+            [data_user.cep for data_user in pending.values()], http_client=http_client
+        )
+        for index, data_user in list(pending.items()):
+            error = cep_errors.get(normalize_cep(data_user.cep))
+            if error is not None:
+                results[index] = UserBulkResult(index=index, status='cep_error', detail=error)
+                del pending[index]
+
+        # only records that passed every check reserve their keys, so later records colliding
+        # with one of them are reported as duplicates of it
+        reject_duplicates(reserve=True)
+
+        hashes = await asyncio.gather(*(has_password_async(data_user.password) for data_user in pending.values()))
+
+        now = datetime.now(timezone.utc)
+        rows: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        for (index, data_user), hashed_password in zip(pending.items(), hashes):
+            user_data = data_user.model_dump(exclude={'cep', 'number', 'public'})
+            user_data.update(id=uuid4(), password=hashed_password, date_created=now)
+            address_data = data_user.model_dump(include={'cep', 'number', 'public'})
+            address_data.update(resolved[normalize_cep(data_user.cep)], user_id=user_data['id'])
+            rows[index] = (user_data, address_data)
+
+        while pending:
+            users = [rows[index][0] for index in pending]
+            addresses = [rows[index][1] for index in pending]
+            try:
+                async with UnitOfWork(self.session):
+                    try:
+                        # executemany with batched multi-row VALUES, no ORM instances
+                        for start in range(0, len(users), USER_BULK_INSERT_BATCH_SIZE):
+                            await self.session.execute(insert(User), users[start:start + USER_BULK_INSERT_BATCH_SIZE])
+                    except IntegrityError as error:
+                        raise self.user_conflict(error)
+                    for start in range(0, len(addresses), USER_BULK_INSERT_BATCH_SIZE):
+                        await self.session.execute(insert(Address), addresses[start:start + USER_BULK_INSERT_BATCH_SIZE])
+                break
+            except UserAlreadyExistsException:
+                # a user sharing a key with the batch was created after the check above: report
+                # the records it collides with as duplicates and insert the others again
+                remaining = len(pending)
+                taken = await self.find_taken_keys(pending.values())
+                await self.session.rollback()
+                reject_duplicates(reserve=False)
+                if len(pending) == remaining:
+                    raise
+
+        for index in pending:
+            results[index] = UserBulkResult(index=index, status='created', id=rows[index][0]['id'])
+
+        report = [results[index] for index in range(len(records))]
+        return UserBulkResponse(created=len(pending), failed=len(records) - len(pending), results=report)
+
+
+    async def find_taken_keys(self, data_users) -> Dict[str, set]:
+        """
+        Finds which CPFs, emails and whatsapps of a batch are already taken, in a single query.
+
+        Args:
+            data_users (Iterable[UserRequestCreate]): The users to check.
+
+        Returns:
+            Dict[str, set]: The taken values, keyed by 'cpf', 'email' and 'whatsapp'.
+        """
+        wanted = {'cpf': set(), 'email': set(), 'whatsapp': set()}
+        for data_user in data_users:
+            wanted['cpf'].add(data_user.cpf)
+            wanted['email'].add(data_user.email)
+            if data_user.whatsapp is not None:
+                wanted['whatsapp'].add(data_user.whatsapp)
+
+        taken = {key: set() for key in wanted}
+        if not wanted['cpf']:
+            return taken
+
+        conditions = [getattr(User, key).in_(values) for key, values in wanted.items() if values]
+        result = await self.session.execute(select(User.cpf, User.email, User.whatsapp).where(or_(*conditions)))
+        for row in result:
+            for key in taken:
+                value = getattr(row, key)
+                if value in wanted[key]:
+                    taken[key].add(value)
+        return taken
+
+
+    async def attach_addresses(self, users: List[UserResponsePublic]) -> List[UserResponsePublic]:
+        """
+        Fills in the public addresses of a page of users, loaded with one batched query.
+
+        Args:
+            users (List[UserResponsePublic]): The users to complete.
+
+        Returns:
+            List[UserResponsePublic]: The same users, with `addresses` set.
+        """
+        address_controller = AddressController(self.session)
+        addresses = await address_controller.find_public_addresses([user.id for user in users])
+        for user in users:
+            user.addresses = addresses[user.id]
+        return users
+
+
     async def find_all_users(self, skip: int, limit: int, active: bool) -> List[UserResponsePublic]:
         """
         Fetch all users from the database.
@@ -70,15 +304,15 @@ class UserService:
         Raises:
             UserNotFoundException: If no users are found.
         """
-        query = select(User)
+        query = select(*PUBLIC_USER_COLUMNS)
         
         if active is False:
             query = query.where(User.active.is_(active))
             
-        query = query.offset(skip).limit(limit)
+        query = query.order_by(User.date_created, User.id).offset(skip).limit(limit)
         
         result = await self.session.execute(query)
-        users = result.scalars().all()
+        users = [self.to_public(row) for row in result]
         
         if not users:
             raise UserNotFoundException()
@@ -86,29 +320,397 @@ class UserService:
         return users
     
     
+    async def count_users(self, active: bool, mode: str = 'estimated') -> Tuple[int, str]:
+        """
+        Counts the users `find_all_users` pages through, exactly or cheaply.
+
+        In 'estimated' mode the total of all users comes from the planner statistics
+        (pg_class.reltuples) and the inactive-only total from `user_count_cache`, which is
+        refreshed with one grouped COUNT at most every USER_COUNT_CACHE_TTL seconds.
+
+        Args:
+            active (bool): Same filter as `find_all_users`.
+            mode (str): 'exact' for a COUNT(*), 'estimated' for the cheap totals.
+
+        Returns:
+            Tuple[int, str]: The total and the mode actually used: 'exact', 'estimated' or 'cached'.
+        """
+        if mode == 'exact':
+            query = select(func.count()).select_from(User)
+            if active is False:
+                query = query.where(User.active.is_(active))
+            return await self.session.scalar(query), 'exact'
+
+        if active is not False:
+            estimate = await self.session.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {'table': User.__tablename__},
+            )
+            # -1 until the table is first analyzed
+            if estimate is not None and estimate >= 0:
+                return estimate, 'estimated'
+
+        key = False if active is False else None
+        count = user_count_cache.get(key)
+        if count is None:
+            result = await self.session.execute(select(User.active, func.count()).group_by(User.active))
+            user_count_cache.update({row[0]: row[1] for row in result})
+            count = user_count_cache.get(key)
+        return count, 'cached'
+
+
+    async def find_users_page(self, limit: int, active: bool,
+                              cursor: Optional[str] = None) -> Tuple[List[UserResponsePublic], Optional[str]]:
+        """
+        Fetch a page of users ordered by (date_created, id), continuing after `cursor`.
+
+        Pages are read with a keyset condition on the (date_created, id) index, so every page
+        costs the same no matter how deep it is, and rows do not shift between pages.
+
+        Args:
+            limit (int): Maximum number of users in the page.
+            active (bool): Same filter as `find_all_users`.
+            cursor (Optional[str]): The `next_cursor` of the previous page, None for the first page.
+
+        Returns:
+            Tuple[List[UserResponsePublic], Optional[str]]: The users and the cursor of the next page, None on the last page.
+
+        Raises:
+            InvalidCursorException: If the cursor is malformed.
+        """
+        query = select(*PUBLIC_USER_COLUMNS)
+
+        if active is False:
+            query = query.where(User.active.is_(active))
+
+        if cursor is not None:
+            try:
+                date_created, user_id = decode_cursor(cursor, 2)
+                after = (datetime.fromisoformat(date_created), UUID(user_id))
+            except ValueError:
+                raise InvalidCursorException()
+            query = query.where(tuple_(User.date_created, User.id) > tuple_(*after))
+
+        # one extra row tells whether there is a next page
+        query = query.order_by(User.date_created, User.id).limit(limit + 1)
+
+        result = await self.session.execute(query)
+        users = [self.to_public(row) for row in result]
+
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].date_created.isoformat(), users[-1].id)
+
+        return users, next_cursor
+
+
+    async def export_users(self, export_format: str = 'ndjson', include_addresses: bool = False,
+                           chunk_size: int = USER_EXPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Exports every user as NDJSON or CSV, in chunks of about `chunk_size` bytes.
+
+        Rows are read through a server-side cursor, USER_EXPORT_BATCH_SIZE at a time, so memory
+        stays flat whatever the number of users. The session must stay open until the
+        iteration ends.
+
+        Args:
+            export_format (str): 'ndjson' for one JSON object per user, or 'csv'.
+            include_addresses (bool): Adds the public addresses, nested in NDJSON and one line per address in CSV.
+            chunk_size (int): Size of the chunks yielded.
+
+        Yields:
+            bytes: The next chunk of the export.
+        """
+        buffer = io.StringIO()
+        async for text in self._export_lines(export_format, include_addresses):
+            buffer.write(text)
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+
+    async def _export_lines(self, export_format: str, include_addresses: bool) -> AsyncIterator[str]:
+        address_keys = [column.key for column in EXPORT_ADDRESS_COLUMNS]
+        query = select(*PUBLIC_USER_COLUMNS)
+        order = [User.date_created, User.id]
+        if include_addresses:
+            query = query.add_columns(
+                *(column.label(f'address_{column.key}') for column in EXPORT_ADDRESS_COLUMNS)
+            ).outerjoin(Address, and_(Address.user_id == User.id, Address.public.is_(True)))
+            order.append(Address.id)
+        query = query.order_by(*order).execution_options(yield_per=USER_EXPORT_BATCH_SIZE)
+
+        result = await self.session.stream(query)
+
+        if export_format == 'csv':
+            line = io.StringIO()
+            writer = csv.writer(line)
+            header = list(PUBLIC_USER_FIELDS)
+            if include_addresses:
+                header += [f'address_{key}' for key in address_keys]
+            writer.writerow(header)
+            async for row in result:
+                values = list(self.to_public(row).model_dump(mode='json', exclude={'addresses'}).values())
+                if include_addresses:
+                    values += [getattr(row, f'address_{key}') for key in address_keys]
+                writer.writerow(values)
+                yield line.getvalue()
+                line.seek(0)
+                line.truncate()
+            return
+
+        # joined rows of a user are consecutive, so each user is written once its rows are done
+        current = None
+        async for row in result:
+            if current is None or current['id'] != str(row.id):
+                if current is not None:
+                    yield json.dumps(current) + '\n'
+                current = self.to_public(row).model_dump(mode='json', exclude={'addresses'})
+                if include_addresses:
+                    current['addresses'] = []
+            if include_addresses and row.address_cep is not None:
+                current['addresses'].append({key: getattr(row, f'address_{key}') for key in address_keys})
+        if current is not None:
+            yield json.dumps(current) + '\n'
+
+
+    async def search_users(self, term: str, limit: int,
+                           cursor: Optional[str] = None) -> Tuple[List[UserResponsePublic], Optional[str]]:
+        """
+        Typo-tolerant search of users by name or by the city or neighborhood of a public address.
+
+        Matches use the pg_trgm `%` operator. Candidates are collected from users and from public
+        addresses separately, each with its trigram GIN index, then ranked by similarity, best first. Pages continue after `cursor`, a keyset on (score, id).
+
+        Args:
+            term (str): The text to look for.
+            limit (int): Maximum number of users in the page.
+            cursor (Optional[str]): The `next_cursor` of the previous page, None for the first page.
+
+        Returns:
+            Tuple[List[UserResponsePublic], Optional[str]]: The users and the cursor of the next page, None on the last page.
+
+        Raises:
+            InvalidCursorException: If the cursor is malformed.
+        """
+        # each branch is served by its own trigram index; OR-ing them in one WHERE would make
+        # Postgres scan users and probe the addresses of every row
+        name_matches = (
+            select(User.id.label('user_id'), func.similarity(User.name, term).label('score'))
+            .where(User.name.op('%')(term))
+        )
+        address_matches = (
+            select(Address.user_id, func.greatest(func.similarity(Address.city, term),
+                                                  func.similarity(Address.neighborhood, term)).label('score'))
+            .where(Address.public.is_(True), or_(Address.city.op('%')(term), Address.neighborhood.op('%')(term)))
+        )
+        candidates = union_all(name_matches, address_matches).subquery()
+        candidate_scores = (
+            select(candidates.c.user_id, func.max(candidates.c.score).label('score'))
+            .group_by(candidates.c.user_id)
+            .subquery()
+        )
+        score = func.greatest(func.similarity(User.name, term), candidate_scores.c.score).label('score')
+
+        matches = (
+            select(*PUBLIC_USER_COLUMNS, score)
+            .join(candidate_scores, candidate_scores.c.user_id == User.id)
+            .subquery()
+        )
+        query = select(matches)
+
+        if cursor is not None:
+            try:
+                last_score, user_id = decode_cursor(cursor, 2)
+                after = (float(last_score), UUID(user_id))
+            except ValueError:
+                raise InvalidCursorException()
+            query = query.where(or_(
+                matches.c.score < literal(after[0]),
+                and_(matches.c.score == literal(after[0]), matches.c.id > after[1]),
+            ))
+
+        query = query.order_by(matches.c.score.desc(), matches.c.id).limit(limit + 1)
+
+        result = await self.session.execute(query)
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(repr(rows[-1].score), rows[-1].id)
+
+        return [self.to_public(row) for row in rows], next_cursor
+
+
+    @staticmethod
+    def user_conflict(error: IntegrityError) -> Exception:
+        """
+        Translates a unique violation on users into the matching UserAlreadyExistsException.
+
+        Args:
+            error (IntegrityError): The error raised by the INSERT.
+
+        Returns:
+            Exception: UserAlreadyExistsException for a known constraint, otherwise DataBaseTransactionException.
+        """
+        constraint = getattr(error.orig.__cause__, 'constraint_name', None)
+        if constraint is None:
+            match = re.search(r'constraint "(\w+)"', str(error.orig))
+            constraint = match.group(1) if match else None
+
+        if constraint in USER_UNIQUE_CONSTRAINTS:
+            return UserAlreadyExistsException(USER_UNIQUE_CONSTRAINTS[constraint][1])
+        return DataBaseTransactionException(error)
+
+
+    async def find_conflicts(self, cpf_user: str, email_user: str, whatsapp: Optional[str]) -> List[str]:
+        """
+        Reports which of the unique keys are already taken, in a single query.
+
+        Args:
+            cpf_user (str): The CPF to check.
+            email_user (str): The email to check.
+            whatsapp (Optional[str]): The whatsapp to check, if any.
+
+        Returns:
+            List[str]: The colliding keys among 'cpf', 'email' and 'whatsapp', in that order.
+        """
+        conditions = [User.cpf == cpf_user, User.email == email_user]
+        if whatsapp is not None:
+            conditions.append(User.whatsapp == whatsapp)
+
+        result = await self.session.execute(
+            select(User.cpf, User.email, User.whatsapp).where(or_(*conditions)).limit(3)
+        )
+        taken = set()
+        for row in result:
+            if row.cpf == cpf_user:
+                taken.add('cpf')
+            if row.email == email_user:
+                taken.add('email')
+            if whatsapp is not None and row.whatsapp == whatsapp:
+                taken.add('whatsapp')
+
+        return [key for key, _ in USER_UNIQUE_CONSTRAINTS.values() if key in taken]
+
+
     async def check_user_exists(self, cpf_user: str, email_user: str, whatsapp: str) -> None:
-        try:
-            await self.get_user_by_cpf(cpf_user)
-        except UserNotFoundException:
-            pass
-        else:
-            raise UserAlreadyExistsException("User with this cpf already exists.")
-        
-        try:
-            await self.get_user_by_email(email_user)
-        except UserNotFoundException:
-            pass
-        else:
-            raise UserAlreadyExistsException("User with this email already exists.")       
-        
-        try:
-            await self.get_user_by_whatsapp(whatsapp)   
-        except UserNotFoundException:
-            pass
-        else:
-            raise UserAlreadyExistsException("User with this whastapp already exists.")       
+        """
+        Checks the CPF, email and whatsapp against existing users in one round trip.
+
+        Raises:
+            UserAlreadyExistsException: If any of them is already taken.
+        """
+        conflicts = await self.find_conflicts(cpf_user, email_user, whatsapp)
+        if conflicts:
+            messages = {key: message for key, message in USER_UNIQUE_CONSTRAINTS.values()}
+            raise UserAlreadyExistsException(messages[conflicts[0]])
         
     
+    @staticmethod
+    def version_columns(include_addresses: bool) -> list:
+        """
+        Columns a single-user response is versioned by: the user's updated_at and, when
+        addresses are embedded, the latest update and the count of its public addresses.
+        """
+        columns = [User.updated_at]
+        if include_addresses:
+            public_addresses = and_(Address.user_id == User.id, Address.public.is_(True))
+            columns += [
+                select(func.max(Address.updated_at)).where(public_addresses).scalar_subquery().label('addresses_updated_at'),
+                select(func.count()).select_from(Address).where(public_addresses).scalar_subquery().label('addresses_count'),
+            ]
+        return columns
+
+
+    @staticmethod
+    def version_validators(version: tuple) -> Tuple[str, datetime]:
+        """
+        Computes the ETag and Last-Modified of a user from its version, the user's id followed by
+        the `version_columns`. A login still waiting in the write-behind buffer is folded in, as
+        responses show it too.
+        """
+        user_id, updated_at, *addresses = version
+        pending = last_login_buffer.get(user_id)
+        parts = [user_id, updated_at.isoformat(), pending.isoformat() if pending else '', *addresses]
+        etag = '"%s"' % hashlib.blake2b('|'.join(map(str, parts)).encode('utf-8'), digest_size=16).hexdigest()
+        last_modified = max(moment for moment in (updated_at, pending, *addresses[:1]) if moment is not None)
+        return etag, last_modified
+
+
+    async def get_user_version(self, field: str, value, include_addresses: bool = False) -> Tuple[str, datetime]:
+        """
+        Returns the validators of a single-user response without loading the user, to answer
+        conditional requests.
+
+        The version comes from `user_version_cache`, or else from a version-only query that
+        also refreshes the cache.
+
+        Args:
+            field (str): The lookup field: 'id', 'cpf' or 'email'.
+            value: The value looked up.
+            include_addresses (bool): Whether the response embeds the public addresses.
+
+        Returns:
+            Tuple[str, datetime]: The strong ETag and the Last-Modified time.
+
+        Raises:
+            UserNotFoundException: If no user matches.
+        """
+        key = (field, value, include_addresses)
+        version = user_version_cache.get(key)
+        if version is None:
+            generation = user_version_cache.generation
+            stmt = select(User.id, *self.version_columns(include_addresses)).where(USER_LOOKUP_COLUMNS[field] == value)
+            result = await self.session.execute(stmt)
+            row = result.first()
+            if not row:
+                raise UserNotFoundException()
+            version = tuple(row)
+            user_version_cache.set(key, version, generation)
+        return self.version_validators(version)
+
+
+    async def get_user_with_version(self, field: str, value,
+                                    include_addresses: bool = False) -> Tuple[UserResponsePublic, str, datetime]:
+        """
+        Loads a user together with the validators of the response.
+
+        The public columns and the version are read by the same statement, so the ETag and
+        Last-Modified describe the row the body is built from. The version also refreshes
+        `user_version_cache`. Embedded addresses are loaded afterwards, by `attach_addresses`;
+        an address changed in between only makes the next revalidation miss.
+
+        Args:
+            field (str): The lookup field: 'id', 'cpf' or 'email'.
+            value: The value looked up.
+            include_addresses (bool): Whether the response embeds the public addresses.
+
+        Returns:
+            Tuple[UserResponsePublic, str, datetime]: The user, its strong ETag and its Last-Modified time.
+
+        Raises:
+            UserNotFoundException: If no user matches.
+        """
+        generation = user_version_cache.generation
+        stmt = (select(*PUBLIC_USER_COLUMNS, *self.version_columns(include_addresses))
+                .where(USER_LOOKUP_COLUMNS[field] == value))
+        result = await self.session.execute(stmt)
+        row = result.first()
+        if not row:
+            raise UserNotFoundException()
+
+        version = (row.id, *row[len(PUBLIC_USER_COLUMNS):])
+        user_version_cache.set((field, value, include_addresses), version, generation)
+        etag, last_modified = self.version_validators(version)
+        return self.to_public(row), etag, last_modified
+
+
     async def get_user_by_id(self, id_user: str) -> UserResponsePublic:
         """
         Retrieves a user by their ID.
@@ -117,18 +719,19 @@ class UserService:
             ID (str): The ID of the user.
 
         Returns:
-            User: The user with the given ID.
+            UserResponsePublic: The user with the given ID.
 
         Raises:
             UserNotFoundException: If no user is found with the given ID.
         """
-        stmt = select(User).filter(User.id == id_user)
+        # lambda statements are built and compiled once; later calls only bind the new value
+        stmt = lambda_stmt(lambda: select(*PUBLIC_USER_COLUMNS).where(User.id == id_user))
         result = await self.session.execute(stmt)
-        user = result.scalars().first()
-        if not user:
+        row = result.first()
+        if not row:
             raise UserNotFoundException()
         
-        return user
+        return self.to_public(row)
     
         
     async def get_user_by_cpf(self, cpf_user: str) -> UserResponsePublic:
@@ -139,18 +742,18 @@ class UserService:
             cpf (str): The CPF of the user.
 
         Returns:
-            User: The user with the given CPF.
+            UserResponsePublic: The user with the given CPF.
 
         Raises:
             UserNotFoundException: If no user is found with the given CPF.
         """
-        stmt = select(User).filter(User.cpf == cpf_user)
+        stmt = lambda_stmt(lambda: select(*PUBLIC_USER_COLUMNS).where(User.cpf == cpf_user))
         result = await self.session.execute(stmt)
-        user = result.scalars().first()
-        if not user:
+        row = result.first()
+        if not row:
             raise UserNotFoundException()
         
-        return user
+        return self.to_public(row)
     
     
     async def get_user_by_whatsapp(self, whatsapp_user: str) -> UserResponsePublic:
@@ -161,18 +764,18 @@ class UserService:
             whatsapp (str): The whatsapp of the user.
 
         Returns:
-            User: The user with the given whatsapp.
+            UserResponsePublic: The user with the given whatsapp.
 
         Raises:
             UserNotFoundException: If no user is found with the given whatsapp.
         """
-        stmt = select(User).filter(User.whatsapp == whatsapp_user)
+        stmt = lambda_stmt(lambda: select(*PUBLIC_USER_COLUMNS).where(User.whatsapp == whatsapp_user))
         result = await self.session.execute(stmt)
-        user = result.scalars().first()
-        if not user:
+        row = result.first()
+        if not row:
             raise UserNotFoundException()
         
-        return user
+        return self.to_public(row)
     
         
     async def get_user_by_email(self, email_user: str) -> UserResponsePublic:
@@ -183,17 +786,17 @@ class UserService:
             email (str): The email of the user.
 
         Returns:
-            User: The user with the given email.
+            UserResponsePublic: The user with the given email.
 
         Raises:
             UserNotFoundException: If no user is found with the given email.
         """
-        stmt = select(User).filter(User.email == email_user)
+        stmt = lambda_stmt(lambda: select(*PUBLIC_USER_COLUMNS).where(User.email == email_user))
         result = await self.session.execute(stmt)
-        user = result.scalars().first()
-        if not user:
+        row = result.first()
+        if not row:
             raise UserNotFoundException()
         
-        return user
+        return self.to_public(row)
     
     
\ No newline at end of file
@@ -0,0 +1,70 @@
+import pytest
+import asyncio
+
+from api.utils.cep_cache import CepCache
+from api.utils.validate_cep import CepNotFoundError
+
+@pytest.mark.asyncio
+async def test_cep_cache_coalesces_concurrent_lookups() -> None:
+    """
+    Test that concurrent lookups for the same CEP share one upstream call.
+
+    Ensures the fetch runs once while every caller receives the same address data.
+    """
+    cache = CepCache(max_size=10, ttl=60, negative_ttl=5, negative_errors=(CepNotFoundError,))
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"uf": "SP"}
+
+    results = await asyncio.gather(*[cache.get_or_fetch("18654000", fetch) for _ in range(10)])
+
+    assert calls == 1
+    assert all(result == {"uf": "SP"} for result in results)
+    assert cache.stats()["coalesced"] == 9
+
+    await cache.get_or_fetch("18654000", fetch)
+    assert calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cep_cache_remembers_not_found() -> None:
+    """
+    Test that "CEP not found" answers are cached and re-raised without calling upstream again.
+    """
+    cache = CepCache(max_size=10, ttl=60, negative_ttl=5, negative_errors=(CepNotFoundError,))
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        raise CepNotFoundError("CEP Code Not Found")
+
+    for _ in range(3):
+        with pytest.raises(CepNotFoundError):
+            await cache.get_or_fetch("00000000", fetch)
+
+    assert calls == 1
+    assert cache.stats()["negative_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cep_cache_evicts_least_recently_used() -> None:
+    """
+    Test that the cache stays within max_size and counts evictions.
+    """
+    cache = CepCache(max_size=2, ttl=60, negative_ttl=5)
+
+    async def fetch():
+        return {}
+
+    for cep in ("00000001", "00000002", "00000003"):
+        await cache.get_or_fetch(cep, fetch)
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
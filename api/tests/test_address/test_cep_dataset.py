@@ -0,0 +1,69 @@
+import pytest
+
+from api.utils.cep_dataset import CepDataset, main
+
+def test_cep_dataset_build_and_lookup(tmp_path) -> None:
+    """
+    Test building a dataset from a CSV dump and resolving CEPs from it.
+
+    Ensures known CEPs return ViaCEP-shaped address data, leading zeros survive,
+    and unknown CEPs return None.
+    """
+    dump = tmp_path / "ceps.csv"
+    dump.write_text(
+        "cep,state,city,neighborhood,road\n"
+        "18654000,SP,Pardinho,Centro,\n"
+        "01001-000,SP,São Paulo,Sé,Praça da Sé\n"
+        "70040010,DF,Brasília,Asa Norte,SBN Quadra 1\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "ceps.bin"
+
+    main([str(dump), str(output)])
+
+    dataset = CepDataset(str(output))
+    assert len(dataset) == 3
+
+    address = dataset.lookup(1001000)
+    assert address["uf"] == "SP"
+    assert address["localidade"] == "São Paulo"
+    assert address["logradouro"] == "Praça da Sé"
+
+    assert dataset.lookup("18654000")["localidade"] == "Pardinho"
+    assert dataset.lookup("70040-010")["bairro"] == "Asa Norte"
+    assert dataset.lookup("99999999") is None
+    dataset.close()
+
+
+def test_cep_dataset_rejects_other_files(tmp_path) -> None:
+    """
+    Test that opening a file that is not a CEP dataset fails loudly.
+    """
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a dataset at all")
+
+    with pytest.raises(ValueError):
+        CepDataset(str(path))
+
+
+def test_cep_dataset_skips_malformed_ceps(tmp_path, caplog) -> None:
+    """
+    Test that records with a malformed CEP are skipped instead of aborting the build.
+    """
+    dump = tmp_path / "ceps.csv"
+    dump.write_text(
+        "cep,state,city,neighborhood,road\n"
+        "18654000,SP,Pardinho,Centro,\n"
+        "18654-0AB,SP,Pardinho,Centro,\n"
+        "123456789,SP,Pardinho,Centro,\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "ceps.bin"
+
+    main([str(dump), str(output)])
+
+    dataset = CepDataset(str(output))
+    assert len(dataset) == 1
+    assert dataset.lookup("18654000")["localidade"] == "Pardinho"
+    dataset.close()
+    assert "Skipped 2 records with a malformed CEP" in caplog.text
@@ -0,0 +1,180 @@
+import time
+import asyncio
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient, ASGITransport
+
+from api.utils.cep_providers import (
+    CepProvider, CepResolver, ViaCepProvider, BrasilApiProvider, CepNotFoundError, CepServiceError
+)
+
+ADDRESS = {"cep": "18654-000", "uf": "SP", "localidade": "Pardinho", "bairro": "Centro", "logradouro": ""}
+
+
+def fake_viacep(delay: float = 0, fail: bool = False) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/ws/{cep}/json/")
+    async def lookup(cep: str):
+        app.state.calls += 1
+        await asyncio.sleep(delay)
+        if fail:
+            raise HTTPException(status_code=503)
+        if cep == "00000000":
+            return {"erro": True}
+        return ADDRESS
+
+    return app
+
+
+def fake_brasilapi(delay: float = 0) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/api/cep/v1/{cep}")
+    async def lookup(cep: str):
+        app.state.calls += 1
+        await asyncio.sleep(delay)
+        return {"cep": cep, "state": "SP", "city": "Pardinho", "neighborhood": "Centro", "street": ""}
+
+    return app
+
+
+def fake_client(viacep: FastAPI, brasilapi: FastAPI) -> AsyncClient:
+    return AsyncClient(mounts={
+        "http://viacep.test": ASGITransport(app=viacep),
+        "http://brasilapi.test": ASGITransport(app=brasilapi),
+    })
+
+
+def providers(failure_threshold: int = 5):
+    return [
+        ViaCepProvider("http://viacep.test/ws", failure_threshold=failure_threshold, reset_timeout=60),
+        BrasilApiProvider("http://brasilapi.test/api/cep/v1", failure_threshold=failure_threshold, reset_timeout=60),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resolver_falls_back_to_next_provider() -> None:
+    """
+    Test that a failing provider hands the lookup over to the next one.
+    """
+    viacep, brasilapi = fake_viacep(fail=True), fake_brasilapi()
+    resolver = CepResolver(providers(), deadline=2, provider_timeout=1)
+
+    async with fake_client(viacep, brasilapi) as client:
+        data = await resolver.resolve("18654000", client)
+
+    assert data["localidade"] == "Pardinho"
+    assert viacep.state.calls == 1
+    assert brasilapi.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_resolver_not_found_is_definitive() -> None:
+    """
+    Test that a "CEP not found" answer is returned without asking other providers.
+    """
+    viacep, brasilapi = fake_viacep(), fake_brasilapi()
+    resolver = CepResolver(providers(), deadline=2, provider_timeout=1)
+
+    async with fake_client(viacep, brasilapi) as client:
+        with pytest.raises(CepNotFoundError):
+            await resolver.resolve("00000000", client)
+
+    assert brasilapi.state.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_resolver_circuit_breaker_skips_unhealthy_provider() -> None:
+    """
+    Test that once the breaker opens, the unhealthy provider is no longer called.
+    """
+    viacep, brasilapi = fake_viacep(fail=True), fake_brasilapi()
+    resolver = CepResolver(providers(failure_threshold=2), deadline=2, provider_timeout=1)
+
+    async with fake_client(viacep, brasilapi) as client:
+        for _ in range(5):
+            await resolver.resolve("18654000", client)
+
+    assert viacep.state.calls == 2
+    assert brasilapi.state.calls == 5
+    assert resolver.stats()["providers"]["viacep"]["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_resolver_hedges_slow_provider() -> None:
+    """
+    Test that a slow first provider is hedged with the second and the fastest answer wins.
+    """
+    viacep, brasilapi = fake_viacep(delay=1), fake_brasilapi()
+    resolver = CepResolver(providers(), deadline=2, provider_timeout=2, hedge_delay=0.05)
+
+    async with fake_client(viacep, brasilapi) as client:
+        started = time.monotonic()
+        data = await resolver.resolve("18654000", client)
+        elapsed = time.monotonic() - started
+
+    assert data["uf"] == "SP"
+    assert elapsed < 0.5
+    assert resolver.stats()["hedged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_resolver_deadline() -> None:
+    """
+    Test that the whole resolution fails fast once the deadline is exceeded.
+    """
+    viacep, brasilapi = fake_viacep(delay=1), fake_brasilapi(delay=1)
+    resolver = CepResolver(providers(), deadline=0.1, provider_timeout=1)
+
+    async with fake_client(viacep, brasilapi) as client:
+        started = time.monotonic()
+        with pytest.raises(CepServiceError):
+            await resolver.resolve("18654000", client)
+
+    assert time.monotonic() - started < 0.5
+
+
+class BrokenProvider(CepProvider):
+    name = 'broken'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    async def fetch(self, cep, client):
+        self.calls += 1
+        return {}['uf']
+
+
+@pytest.mark.asyncio
+async def test_resolver_unexpected_provider_error() -> None:
+    """
+    Test that an unexpected error in a provider counts as a failure and falls back.
+
+    The half-open trial slot must be released, so the provider keeps getting trial calls.
+    """
+    broken = BrokenProvider("http://broken.test", failure_threshold=1, reset_timeout=0)
+    brasilapi = fake_brasilapi()
+    resolver = CepResolver([broken, providers()[1]], deadline=2, provider_timeout=1)
+
+    async with fake_client(fake_viacep(), brasilapi) as client:
+        for _ in range(3):
+            data = await resolver.resolve("18654000", client)
+            assert data["localidade"] == "Pardinho"
+
+    assert broken.calls == 3
+    assert resolver.stats()["providers"]["broken"]["consecutive_failures"] == 3
+
+
+def test_cep_provider_requires_fetch() -> None:
+    """
+    Test that a provider without `fetch` cannot be instantiated.
+    """
+    class Incomplete(CepProvider):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete("http://incomplete.test")
@@ -0,0 +1,38 @@
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+
+from api.schemas.address_schema import CepAddressResponse
+
+@pytest.mark.asyncio
+async def test_resolve_ceps_partial_results(client: AsyncClient) -> None:
+    """
+    Test resolving a batch of CEPs.
+
+    Ensures duplicated CEPs are returned once, and that a CEP that does not exist
+    is reported in the errors without failing the rest of the batch.
+    """
+    response = await client.post("/addresses/ceps/resolve", json={"ceps": [18654000, 18654000, 0]})
+    assert response.status_code == status.HTTP_200_OK
+
+    body = response.json()
+    assert [address["cep"] for address in body["results"]] == ["18654000"]
+    assert body["results"][0]["state"] == "SP"
+    assert body["errors"] == {"00000000": "CEP Code Not Found"}
+
+
+@pytest.mark.asyncio
+async def test_resolve_ceps_empty_batch(client: AsyncClient) -> None:
+    """
+    Test that an empty batch is rejected with a 422 status code.
+    """
+    response = await client.post("/addresses/ceps/resolve", json={"ceps": []})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_resolve_ceps_partial_address() -> None:
+    """
+    Test that an address a provider only partly filled in is still a valid result.
+    """
+    address = CepAddressResponse(cep="18654000", state=None, city=None, neighborhood=None, road=None)
+    assert address.model_dump()["state"] is None
@@ -2,6 +2,15 @@ import pytest
 import jwt
 from httpx import AsyncClient
 from fastapi import status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.User import User
+from api.tests.conftest import user_payload
+from api.utils.password_policy import PasswordHashPolicy, password_policy
+
+# argon2 parameters cheap enough for tests
+ARGON2_TEST_COSTS = {"argon2_time_cost": 1, "argon2_memory_kib": 8, "argon2_parallelism": 1}
 
 @pytest.mark.asyncio
 async def test_failed_login(client: AsyncClient):
@@ -51,4 +60,93 @@ async def test_login(client: AsyncClient):
     
     body = response.json()
     assert "access_token" in body
-    assert body["token_type"] == "bearer"
\ No newline at end of file
+    assert body["token_type"] == "bearer"
+
+@pytest.mark.asyncio
+async def test_login_throttled_after_repeated_failures(client: AsyncClient):
+    """
+    Test that repeated failed logins lock the email out.
+
+    This test verifies that once the failure limit for an email is reached,
+    further attempts are rejected with 429 Too Many Requests and a Retry-After header,
+    even with the correct password.
+    """
+    credentials = {"email": "throttled@example.com", "password": "wrongpassword"}
+
+    for _ in range(5):
+        response = await client.post("/auth/", json=credentials)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.post("/auth/", json=credentials)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_password_rehash_only_upgrades_work_factor():
+    """
+    Test that only hashes cheaper than the policy are rehashed.
+
+    Workers calibrated to different rounds must not downgrade each other's hashes.
+    """
+    cheap, strong = PasswordHashPolicy(bcrypt_rounds=10), PasswordHashPolicy(bcrypt_rounds=11)
+
+    assert strong.needs_rehash(cheap.hash("securepassword"))
+    assert not cheap.needs_rehash(strong.hash("securepassword"))
+    assert not cheap.needs_rehash(cheap.hash("securepassword"))
+
+
+def test_argon2_hash_and_verify():
+    """
+    Test hashing and verifying passwords with the argon2 scheme.
+
+    This test verifies that argon2 hashes check the right password only, that bcrypt hashes
+    made before the switch still verify, and that those and cheaper argon2 hashes are rehashed.
+    """
+    policy = PasswordHashPolicy(scheme="argon2", **ARGON2_TEST_COSTS)
+    hashed = policy.hash("securepassword")
+
+    assert hashed.startswith("$argon2")
+    assert policy.verify("securepassword", hashed)
+    assert not policy.verify("wrongpassword", hashed)
+    assert not policy.needs_rehash(hashed)
+
+    old_hash = PasswordHashPolicy(bcrypt_rounds=10).hash("securepassword")
+    assert policy.verify("securepassword", old_hash)
+    assert policy.needs_rehash(old_hash)
+
+    stronger = PasswordHashPolicy(scheme="argon2", **{**ARGON2_TEST_COSTS, "argon2_time_cost": 2})
+    assert stronger.needs_rehash(hashed)
+    assert stronger.verify("securepassword", hashed)
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_bcrypt_password_to_argon2(client: AsyncClient, setup_database: AsyncSession,
+                                                        monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that a login upgrades a bcrypt hash once the policy switched to argon2.
+
+    This test verifies that the stored hash is replaced by an argon2 one on a successful
+    login, and that the user can still log in with it.
+    """
+    user = user_payload()
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    async def stored_hash() -> str:
+        result = await setup_database.execute(select(User.password).where(User.email == user["email"]))
+        await setup_database.rollback()
+        return result.scalar_one()
+
+    assert (await stored_hash()).startswith("$2b$")
+
+    monkeypatch.setattr(password_policy, "scheme", "argon2")
+    for name, value in ARGON2_TEST_COSTS.items():
+        monkeypatch.setattr(password_policy, name, value)
+
+    credentials = {"email": user["email"], "password": user["password"]}
+    response = await client.post("/auth/", json=credentials)
+    assert response.status_code == status.HTTP_200_OK
+    assert (await stored_hash()).startswith("$argon2")
+
+    response = await client.post("/auth/", json=credentials)
+    assert response.status_code == status.HTTP_200_OK
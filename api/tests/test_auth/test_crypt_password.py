@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import pytest
+
+from api.utils import crypt_password
+from api.utils.crypt_password import has_password_async, verify_password_async, hash_pool_stats
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_runs_on_hash_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that hashing and verification run on the hashing pool, not on the event loop.
+
+    This test checks that the work runs in a pool thread, that the loop keeps running
+    meanwhile, and that the pool's counters are updated.
+    """
+    threads = []
+    has_password = crypt_password.has_password
+
+    def record_thread(password, policy=None):
+        threads.append(threading.current_thread().name)
+        return has_password(password, policy)
+
+    monkeypatch.setattr(crypt_password, "has_password", record_thread)
+    completed = hash_pool_stats.completed
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        hashed = await has_password_async("securepassword")
+    finally:
+        ticker.cancel()
+
+    assert threads and threads[0].startswith("password-hash")
+    assert threads[0] != threading.current_thread().name
+    assert ticks > 1
+
+    assert await verify_password_async("securepassword", hashed)
+    assert not await verify_password_async("wrongpassword", hashed)
+
+    assert hash_pool_stats.completed == completed + 3
+    assert hash_pool_stats.in_flight == 0
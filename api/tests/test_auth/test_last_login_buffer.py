@@ -0,0 +1,46 @@
+import uuid
+import asyncio
+import pytest
+from datetime import datetime, timezone
+
+from api.utils.last_login_buffer import LastLoginBuffer
+
+
+class FakeSession:
+    def __init__(self, delay: float, writes: list):
+        self.delay = delay
+        self.writes = writes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        await asyncio.sleep(self.delay)
+
+    async def commit(self):
+        self.writes.append(True)
+
+
+@pytest.mark.asyncio
+async def test_last_login_buffer_keeps_logins_of_cancelled_flush() -> None:
+    """
+    Test that stopping the buffer during a flush still writes the logins being flushed.
+    """
+    writes = []
+    delays = iter([10, 0])
+    buffer = LastLoginBuffer(session_factory=lambda: FakeSession(next(delays), writes), flush_interval=0)
+    user_id = uuid.uuid4()
+    buffer.record(user_id, datetime.now(timezone.utc))
+
+    buffer.start()
+    await asyncio.sleep(0.05)
+    assert buffer.get(user_id) is not None
+
+    await buffer.stop()
+
+    assert writes == [True]
+    assert buffer.stats()["rows_written"] == 1
+    assert buffer.stats()["pending"] == 0
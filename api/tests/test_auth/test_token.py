@@ -0,0 +1,81 @@
+import uuid
+import pytest
+from datetime import timedelta
+from httpx import AsyncClient
+from fastapi import status
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from api.utils.token import TokenVerifier, create_access_token, token_verifier
+
+
+def test_token_verifier_caches_valid_tokens() -> None:
+    """
+    Test that a verified token is served from the cache the next time.
+
+    This test checks that the second verification is a hit with the same payload, and that
+    changing a returned payload does not change the cached one.
+    """
+    verifier = TokenVerifier()
+    user_id = uuid.uuid4()
+    token = create_access_token(user_id)
+
+    payload = verifier.verify(token)
+    assert payload["sub"] == str(user_id)
+    payload["sub"] = "changed"
+
+    assert verifier.verify(token)["sub"] == str(user_id)
+    assert verifier.stats()["hits"] == 1
+    assert verifier.stats()["misses"] == 1
+
+
+def test_token_verifier_does_not_cache_rejected_tokens() -> None:
+    """
+    Test that expired and invalid tokens are rejected every time and never cached.
+    """
+    verifier = TokenVerifier()
+    expired = create_access_token(uuid.uuid4(), expires_delta=timedelta(seconds=-1))
+
+    for _ in range(2):
+        with pytest.raises(ExpiredSignatureError):
+            verifier.verify(expired)
+        with pytest.raises(JWTError):
+            verifier.verify("invalid")
+
+    assert verifier.stats()["size"] == 0
+    assert verifier.stats()["hits"] == 0
+
+
+def test_token_verifier_evicts_least_recently_used() -> None:
+    """
+    Test that the cache keeps at most `max_size` tokens, dropping the least recently used.
+    """
+    verifier = TokenVerifier(max_size=2)
+    first, second, third = (create_access_token(uuid.uuid4()) for _ in range(3))
+
+    verifier.verify(first)
+    verifier.verify(second)
+    verifier.verify(first)
+    verifier.verify(third)
+    assert verifier.stats()["size"] == 2
+
+    verifier.verify(first)
+    assert verifier.stats()["hits"] == 2
+    verifier.verify(second)
+    assert verifier.stats()["misses"] == 4
+
+
+@pytest.mark.asyncio
+async def test_authenticated_route_uses_token_cache(client: AsyncClient) -> None:
+    """
+    Test that repeated requests with the same bearer token hit the shared token cache.
+    """
+    user_id = uuid.uuid4()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    hits = token_verifier.hits
+
+    for _ in range(2):
+        response = await client.get("/auth/", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["user"]["sub"] == str(user_id)
+
+    assert token_verifier.hits == hits + 1
@@ -0,0 +1,52 @@
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.database.connection import InstrumentedAsyncQueuePool, pool_metrics
+from api.tests.conftest import DATABASE_URL
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_count_acquisitions(client: AsyncClient) -> None:
+    """
+    Test that the metrics endpoint reports the primary pool and counts its checkouts.
+    """
+    response = await client.get("/metrics/")
+    assert response.status_code == status.HTTP_200_OK
+    before = response.json()["database_pool"]["primary"]
+    assert before["checked_out"] == 0
+
+    # no users yet, but the lookup still checks a connection out
+    response = await client.get("/users/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await client.get("/metrics/")
+    after = response.json()["database_pool"]["primary"]
+    assert after["acquisitions"] > before["acquisitions"]
+    assert after["checked_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_count_timeouts() -> None:
+    """
+    Test that a checkout waiting past the pool timeout is counted as a timeout.
+
+    This test checks that with a single pooled connection held, a second checkout times
+    out, and that both checkouts and the wait are recorded.
+    """
+    engine = create_async_engine(DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, pool_size=1,
+                                 max_overflow=0, pool_timeout=0.1, pool_logging_name="test-timeouts")
+    try:
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+
+    metrics = pool_metrics["test-timeouts"]
+    assert metrics.acquisitions == 2
+    assert metrics.timeouts == 1
+    assert metrics.max_wait >= 0.1
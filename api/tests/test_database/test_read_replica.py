@@ -0,0 +1,52 @@
+import time
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+
+from api.database import dependencies
+from api.database.connection import async_read_session
+from api.database.dependencies import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER
+from api.tests.conftest import user_payload
+
+user = user_payload()
+
+
+@pytest.mark.asyncio
+async def test_reads_follow_own_writes_to_primary(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that reads go to the replica unless the client has to read its own writes.
+
+    This test checks that a write pins the client's next reads to the primary with a cookie,
+    that other clients read from the replica, and that the X-Read-Your-Writes header
+    forces a read from the primary.
+    """
+    replica_reads = []
+
+    def replica_session():
+        replica_reads.append(True)
+        return async_read_session()
+
+    monkeypatch.setattr(dependencies, "async_read_session", replica_session)
+
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert int(response.cookies[READ_YOUR_WRITES_COOKIE]) > time.time()
+    id = response.json()["id"]
+
+    response = await client.get(f"/users/{id}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert replica_reads == []
+
+    client.cookies.clear()
+    response = await client.get(f"/users/{id}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert replica_reads == [True]
+
+    response = await client.get(f"/users/{id}/", headers={READ_YOUR_WRITES_HEADER: "true"})
+    assert response.status_code == status.HTTP_200_OK
+    assert replica_reads == [True]
+
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, str(int(time.time()) - 1))
+    response = await client.get(f"/users/{id}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert replica_reads == [True, True]
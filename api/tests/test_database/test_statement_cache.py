@@ -0,0 +1,32 @@
+import uuid
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+
+
+async def statement_cache(client: AsyncClient) -> dict:
+    response = await client.get("/metrics/")
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()["statement_cache"]["primary"]
+
+
+@pytest.mark.asyncio
+async def test_repeated_lookups_hit_statement_cache(client: AsyncClient) -> None:
+    """
+    Test that a lookup repeated with another value reuses the compiled statement.
+
+    This test checks that, once warmed up, looking up other ids only adds cache hits.
+    """
+    response = await client.get(f"/users/{uuid.uuid4()}/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    before = await statement_cache(client)
+    assert before["size"] > 0
+
+    for _ in range(3):
+        response = await client.get(f"/users/{uuid.uuid4()}/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    after = await statement_cache(client)
+    assert after["hits"] == before["hits"] + 3
+    assert after["misses"] == before["misses"]
+    assert after["hit_ratio"] > 0
@@ -0,0 +1,89 @@
+import pytest
+from datetime import date
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.User import User
+from api.database.unit_of_work import UnitOfWork, UNIT_OF_WORK_KEY
+from api.handlers.exceptions.database_exceptions import DataBaseTransactionException
+
+
+def make_user(index: int, **overrides) -> User:
+    data = {
+        "cpf": f"1234567891{index}",
+        "email": f"uow{index}@example.com",
+        "name": "UserExample1",
+        "password": "-",
+        "sex": "M",
+        "date_birth": date(1990, 1, 1),
+    }
+    data.update(overrides)
+    return User(**data)
+
+
+async def committed_users(session: AsyncSession) -> int:
+    # counted through another session, so only committed rows are seen
+    async with AsyncSession(session.bind) as other:
+        return await other.scalar(select(func.count()).select_from(User))
+
+
+@pytest.mark.asyncio
+async def test_nested_unit_of_work_commits_once(setup_database: AsyncSession) -> None:
+    """
+    Test that a unit of work opened inside another joins its transaction.
+
+    This test checks that nothing is committed when the inner block ends, and that the
+    outer block commits the writes of both.
+    """
+    session = setup_database
+    async with UnitOfWork(session) as outer:
+        session.add(make_user(1))
+        async with UnitOfWork(session) as inner:
+            session.add(make_user(2))
+            await inner.flush()
+        assert outer.outermost and not inner.outermost
+        assert session.in_transaction()
+        assert await committed_users(session) == 0
+
+    assert await committed_users(session) == 2
+    assert UNIT_OF_WORK_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_error(setup_database: AsyncSession) -> None:
+    """
+    Test that an error raised inside a nested unit of work rolls back the whole transaction.
+    """
+    session = setup_database
+    with pytest.raises(ValueError):
+        async with UnitOfWork(session):
+            session.add(make_user(1))
+            async with UnitOfWork(session) as inner:
+                session.add(make_user(2))
+                await inner.flush()
+                raise ValueError("fails after the flush")
+
+    assert await committed_users(session) == 0
+    assert UNIT_OF_WORK_KEY not in session.info
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_raises_database_errors_as_http_errors(setup_database: AsyncSession) -> None:
+    """
+    Test that a database error leaving the unit of work is raised as DataBaseTransactionException.
+
+    This test checks that a unique violation is rolled back and reported as a 500, and that
+    the session can be used again afterwards.
+    """
+    session = setup_database
+    with pytest.raises(DataBaseTransactionException) as error:
+        async with UnitOfWork(session) as unit_of_work:
+            session.add(make_user(1))
+            session.add(make_user(2, cpf="12345678911"))
+            await unit_of_work.flush()
+    assert error.value.status_code == 500
+    assert "Integrity constraint violated" in error.value.detail
+
+    async with UnitOfWork(session):
+        session.add(make_user(3))
+    assert await committed_users(session) == 1
@@ -0,0 +1,102 @@
+import pytest
+from datetime import date
+from httpx import AsyncClient
+from fastapi import status
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.User import User
+from api.services import user_service
+from api.tests.conftest import user_payload
+
+
+@pytest.mark.asyncio
+async def test_create_users_bulk(client: AsyncClient) -> None:
+    """
+    Test the bulk creation of users.
+
+    This test checks that valid records are created and that invalid records,
+    duplicates within the batch and duplicates of existing users are reported
+    per record without failing the batch.
+    """
+    response = await client.post("/users/", json=user_payload(0))
+    assert response.status_code == status.HTTP_201_CREATED
+
+    users = [
+        user_payload(1),
+        user_payload(2, cpf="123"),
+        user_payload(3, email="user0@example.com"),
+        user_payload(4, email="user1@example.com"),
+        user_payload(5),
+    ]
+    response = await client.post("/users/bulk", json={"users": users})
+    assert response.status_code == status.HTTP_200_OK
+
+    body = response.json()
+    assert body["created"] == 2
+    assert body["failed"] == 3
+    assert [result["status"] for result in body["results"]] == ["created", "invalid", "duplicate", "duplicate", "created"]
+    assert body["results"][2]["detail"] == "User with this email already exists."
+
+    created = await client.get(f"/users/{body['results'][0]['id']}/")
+    assert created.status_code == status.HTTP_200_OK
+    assert created.json()["email"] == "user1@example.com"
+
+
+@pytest.mark.asyncio
+async def test_create_users_bulk_cep_error_reserves_no_keys(client: AsyncClient) -> None:
+    """
+    Test that a record failing on its CEP does not make a later record a duplicate.
+
+    This test checks that a valid record sharing the email of a record with an
+    unknown CEP is created, since the first one is never inserted.
+    """
+    users = [
+        user_payload(1, cep="00000000"),
+        user_payload(2, email="user1@example.com"),
+    ]
+    response = await client.post("/users/bulk", json={"users": users})
+    assert response.status_code == status.HTTP_200_OK
+
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["cep_error", "created"]
+    assert body["created"] == 1
+
+
+@pytest.mark.asyncio
+async def test_create_users_bulk_concurrent_duplicate(client: AsyncClient, setup_database: AsyncSession,
+                                                      monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test a user created by another request after the duplicate check of a batch.
+
+    This test checks that only the record colliding with that user is reported as a
+    duplicate, and that the other records are still created.
+    """
+    hash_password = user_service.has_password_async
+    concurrent = []
+
+    async def hash_after_concurrent_insert(password: str) -> str:
+        # runs between the duplicate check and the insert, like a request racing the batch
+        if not concurrent:
+            concurrent.append(True)
+            await setup_database.execute(insert(User).values(
+                cpf="99999999999", name="Concurrent", email="user2@example.com", password="-",
+                sex="M", date_birth=date(1990, 1, 1)))
+            await setup_database.commit()
+        return await hash_password(password)
+
+    monkeypatch.setattr(user_service, "has_password_async", hash_after_concurrent_insert)
+
+    users = [user_payload(1), user_payload(2), user_payload(3)]
+    response = await client.post("/users/bulk", json={"users": users})
+    assert response.status_code == status.HTTP_200_OK
+
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["created", "duplicate", "created"]
+    assert body["results"][1]["detail"] == "User with this email already exists."
+    assert body["created"] == 2
+    assert body["failed"] == 1
+
+    created = await client.get(f"/users/{body['results'][2]['id']}/")
+    assert created.status_code == status.HTTP_200_OK
+    assert created.json()["email"] == "user3@example.com"
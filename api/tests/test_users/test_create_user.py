@@ -3,6 +3,8 @@ from httpx import AsyncClient
 from sqlalchemy.dialects.postgresql import UUID
 from fastapi import status
 
+from api.tests.conftest import user_payload
+
 @pytest.mark.asyncio
 async def test_create_new_user_duplicate_email(client: AsyncClient) -> None:
     """
@@ -220,6 +222,23 @@ async def test_create_new_user(client: AsyncClient) -> None:
     assert body["sex"] == user["sex"]
     
 
+@pytest.mark.asyncio
+async def test_create_new_user_duplicate_before_cep_error(client: AsyncClient) -> None:
+    """
+    Test that a duplicate user is reported ahead of an unknown CEP.
+
+    Ensures that the API returns 409, not 422, when the CPF is taken and the CEP does not exist.
+    """
+    user = user_payload()
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    duplicate = user_payload(1, cpf=user["cpf"], cep="00000000")
+    response = await client.post("/users/", json=duplicate)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["detail"] == "User with this cpf already exists."
+
+
 """
 @pytest.mark.asyncio
 async def test_create_new_user_invalid_cep(mock_get, client: AsyncClient):
@@ -243,4 +262,32 @@ async def test_create_new_user_invalid_cep(mock_get, client: AsyncClient):
     body = response.json()
     assert 'cep' in body['detail'][0]['loc'], "The error message should specify the 'cep' field as problematic."
     assert 'CEP Não Encontrado' in body['detail'][0]['msg'], "The error message should clearly state that the CEP was not found."    
-"""
\ No newline at end of file
+"""
+
+@pytest.mark.asyncio
+async def test_create_new_user_returns_public_user(client: AsyncClient) -> None:
+    """
+    Test the body returned when a user is created.
+
+    This test checks that a created user comes back with a 201 status code and its
+    public fields, with no login yet and without the password.
+    """
+    user = user_payload()
+
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    body = response.json()
+    assert body["id"]
+    assert body["email"] == user["email"]
+    assert body["name"] == user["name"]
+    assert body["sex"] == user["sex"]
+    assert body["date_birth"].startswith(user["date_birth"])
+    assert body["active"] is True
+    assert body["date_created"]
+    assert body["date_login"] is None
+    assert "password" not in body
+
+    fetched = await client.get(f"/users/{body['id']}/")
+    assert fetched.status_code == status.HTTP_200_OK
+    assert fetched.json()["email"] == user["email"]
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+
+from api.tests.conftest import user_payload
+
+user = user_payload()
+
+
+async def auth_headers(client: AsyncClient) -> dict:
+    """
+    Logs in as `user` and returns the Authorization header of its token.
+    """
+    response = await client.post("/auth/", json={"email": user["email"], "password": user["password"]})
+    assert response.status_code == status.HTTP_200_OK
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_export_users_ndjson(client: AsyncClient) -> None:
+    """
+    Test the NDJSON export of users with their addresses.
+
+    This test checks that each user is exported as one JSON line with the
+    addresses nested, and that the password is not part of the export.
+    """
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get("/users/export", params={"include_addresses": True},
+                                headers=await auth_headers(client))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = response.text.splitlines()
+    assert len(lines) == 1
+    exported = json.loads(lines[0])
+    assert exported["email"] == user["email"]
+    assert "password" not in exported
+    assert [address["cep"] for address in exported["addresses"]] == [18654000]
+
+
+@pytest.mark.asyncio
+async def test_export_users_csv(client: AsyncClient) -> None:
+    """
+    Test the CSV export of users.
+
+    This test checks that the export starts with a header row followed by one row per user.
+    """
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get("/users/export", params={"format": "csv"}, headers=await auth_headers(client))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["email"] for row in rows] == [user["email"]]
+
+
+@pytest.mark.asyncio
+async def test_export_users_skips_private_addresses(client: AsyncClient) -> None:
+    """
+    Test that private addresses are left out of the export.
+
+    This test checks that a user whose only address is private is exported
+    with no addresses, in NDJSON and in CSV.
+    """
+    private_user = {**user, "public": False}
+    response = await client.post("/users/", json=private_user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    headers = await auth_headers(client)
+    response = await client.get("/users/export", params={"include_addresses": True}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    exported = json.loads(response.text.splitlines()[0])
+    assert exported["addresses"] == []
+
+    response = await client.get("/users/export", params={"format": "csv", "include_addresses": True},
+                                headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert "address_public" not in rows[0]
+    assert rows[0]["address_cep"] == ""
+    assert rows[0]["address_road"] == ""
+
+
+@pytest.mark.asyncio
+async def test_export_users_requires_authentication(client: AsyncClient) -> None:
+    """
+    Test that the export is refused without a valid token.
+
+    This test checks that anonymous clients and invalid tokens get a 401.
+    """
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get("/users/export")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.get("/users/export", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,10 +1,15 @@
 import pytest
 import uuid
-import asyncio
 from sqlalchemy.dialects.postgresql import UUID
 from httpx import AsyncClient
 from fastapi import status
 
+from sqlalchemy import event
+
+from api.database.connection import read_engine
+from api.utils.last_login_buffer import last_login_buffer
+from api.tests.conftest import user_payload
+
 @pytest.mark.asyncio
 async def test_find_all_users_not_found(client: AsyncClient) -> None:
     """
@@ -329,3 +334,234 @@ async def test_find_all_users(client: AsyncClient) -> None:
     assert user1["email"] in emails
     assert user2["email"] in emails
 
+
+
+@pytest.mark.asyncio
+async def test_find_users_page_cursor(client: AsyncClient) -> None:
+    """
+    Test the cursor pagination of users.
+
+    This test checks that following `next_cursor` walks through every user
+    exactly once, in creation order, and that the last page has no cursor.
+    """
+    emails = []
+    for index in range(3):
+        user = user_payload(index)
+        response = await client.post("/users/", json=user)
+        assert response.status_code == status.HTTP_201_CREATED
+        emails.append(user["email"])
+
+    first = await client.get("/users/page", params={"limit": 2})
+    assert first.status_code == status.HTTP_200_OK
+    body = first.json()
+    assert [user["email"] for user in body["items"]] == emails[:2]
+    assert body["next_cursor"]
+
+    second = await client.get("/users/page", params={"limit": 2, "cursor": body["next_cursor"]})
+    assert second.status_code == status.HTTP_200_OK
+    body = second.json()
+    assert [user["email"] for user in body["items"]] == emails[2:]
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_find_users_page_invalid_cursor(client: AsyncClient) -> None:
+    """
+    Test that a malformed cursor is rejected with a 400 status code.
+    """
+    response = await client.get("/users/page", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+@pytest.mark.asyncio
+async def test_search_users_by_name(client: AsyncClient) -> None:
+    """
+    Test the typo-tolerant search of users by name.
+
+    This test checks that a misspelled name still finds the user, and that
+    users whose names do not resemble the term are left out.
+    """
+    names = ["Maria Aparecida", "Joaquim Barbosa"]
+    for index, name in enumerate(names):
+        user = user_payload(index, name=name, sex="F")
+        response = await client.post("/users/", json=user)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get("/users/search", params={"q": "Maria Aparesida"})
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [user["name"] for user in body["items"]] == ["Maria Aparecida"]
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_users_by_city(client: AsyncClient) -> None:
+    """
+    Test the search of users by the city of their address.
+
+    This test checks that a misspelled city finds the users with a public
+    address there, and leaves out the users whose address is private.
+    """
+    for index, public in enumerate([True, False]):
+        user = user_payload(index, name=f"Joaquim Barbosa {index}", public=public)
+        response = await client.post("/users/", json=user)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get("/users/search", params={"q": "Pardino"})
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [user["email"] for user in body["items"]] == [user_payload(0)["email"]]
+
+
+@pytest.mark.asyncio
+async def test_find_all_users_total_count(client: AsyncClient) -> None:
+    """
+    Test the total count headers of the user listing.
+
+    This test checks that an exact count reports every user even when the
+    page is smaller, and that the mode used is reported.
+    """
+    for index in range(2):
+        user = user_payload(index)
+        response = await client.post("/users/", json=user)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get("/users/", params={"limit": 1, "count": "exact"})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "2"
+    assert response.headers["X-Total-Count-Mode"] == "exact"
+
+    response = await client.get("/users/", params={"limit": 1, "count": "estimated"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Total-Count-Mode"] in ("estimated", "cached")
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_include_addresses(client: AsyncClient) -> None:
+    """
+    Test embedding the addresses in a user response.
+
+    This test checks that addresses are only returned when requested with
+    include=addresses, and that private addresses are left out.
+    """
+    users = []
+    for index, public in enumerate([True, False]):
+        user = user_payload(index, public=public)
+        response = await client.post("/users/", json=user)
+        assert response.status_code == status.HTTP_201_CREATED
+        users.append(response.json())
+
+    response = await client.get(f"/users/{users[0]['id']}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert "addresses" not in response.json()
+
+    response = await client.get(f"/users/{users[0]['id']}/", params={"include": "addresses"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [address["cep"] for address in response.json()["addresses"]] == [18654000]
+
+    response = await client.get(f"/users/{users[1]['id']}/", params={"include": "addresses"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["addresses"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_not_modified(client: AsyncClient) -> None:
+    """
+    Test conditional requests for a user.
+
+    This test checks that a response carries an ETag and a Last-Modified date, and that
+    sending either of them back answers 304 without a body.
+    """
+    user = user_payload()
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+    id = response.json()["id"]
+
+    response = await client.get(f"/users/{id}/")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = await client.get(f"/users/{id}/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = await client.get(f"/users/{id}/", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = await client.get(f"/users/{id}/", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await client.get(f"/users/{id}/", params={"include": "addresses"}, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_etag_changes_after_login_flush(client: AsyncClient) -> None:
+    """
+    Test that a login changes the ETag of a user, also once it is written to the database.
+
+    This test checks that the ETag from before the login never answers 304 again,
+    neither while the login is buffered nor after the buffer was flushed.
+    """
+    user = user_payload()
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+    id = response.json()["id"]
+
+    response = await client.get(f"/users/{id}/")
+    etag = response.headers["etag"]
+    response = await client.get(f"/users/{id}/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = await client.post("/auth/", json={"email": user["email"], "password": user["password"]})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await client.get(f"/users/{id}/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["date_login"] is not None
+
+    await last_login_buffer.flush()
+
+    response = await client.get(f"/users/{id}/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["date_login"] is not None
+    current = response.headers["etag"]
+    assert current != etag
+
+    response = await client.get(f"/users/{id}/", headers={"If-None-Match": current})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_reads_body_and_version_together(client: AsyncClient) -> None:
+    """
+    Test that a full response reads the user and its validators with one statement.
+
+    This test checks that a plain GET runs a single query, and that its ETag is the one a
+    revalidation, served from the version cache, compares against.
+    """
+    user = user_payload()
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+    id = response.json()["id"]
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(read_engine.sync_engine, 'before_cursor_execute', count_statement)
+    try:
+        response = await client.get(f"/users/{id}/")
+    finally:
+        event.remove(read_engine.sync_engine, 'before_cursor_execute', count_statement)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(statements) == 1
+
+    response = await client.get(f"/users/{id}/", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
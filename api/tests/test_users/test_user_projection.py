@@ -0,0 +1,69 @@
+import uuid
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from fastapi import status
+from sqlalchemy import event
+
+from api.services import user_service
+from api.services.user_service import PUBLIC_USER_FIELDS
+from api.database.connection import read_engine
+from api.utils.last_login_buffer import LastLoginBuffer
+from api.tests.conftest import user_payload
+
+user = user_payload()
+
+
+@pytest.mark.asyncio
+async def test_user_reads_select_only_public_columns(client: AsyncClient) -> None:
+    """
+    Test that user reads load only the columns of the public response.
+
+    This test checks that the listing and the single-user lookup never read the password,
+    CPF or whatsapp, and return exactly the public fields.
+    """
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+    id = response.json()["id"]
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(read_engine.sync_engine, 'before_cursor_execute', record_statement)
+    try:
+        listing = await client.get("/users/")
+        single = await client.get(f"/users/{id}/")
+    finally:
+        event.remove(read_engine.sync_engine, 'before_cursor_execute', record_statement)
+
+    assert listing.status_code == status.HTTP_200_OK
+    assert single.status_code == status.HTTP_200_OK
+    assert set(listing.json()[0]) == set(PUBLIC_USER_FIELDS)
+    assert set(single.json()) == set(PUBLIC_USER_FIELDS)
+
+    assert statements
+    for statement in statements:
+        for column in ("users.password", "users.cpf", "users.whatsapp"):
+            assert column not in statement
+
+
+@pytest.mark.asyncio
+async def test_user_reads_show_buffered_login(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that a login still waiting in the write-behind buffer shows in the projected user.
+    """
+    response = await client.post("/users/", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+    id = response.json()["id"]
+    assert response.json()["date_login"] is None
+
+    buffer = LastLoginBuffer()
+    date_login = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    buffer.record(uuid.UUID(id), date_login)
+    monkeypatch.setattr(user_service, "last_login_buffer", buffer)
+
+    response = await client.get(f"/users/{id}/")
+    assert response.status_code == status.HTTP_200_OK
+    assert datetime.fromisoformat(response.json()["date_login"]) == date_login
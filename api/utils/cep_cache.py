@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+
+class CepCache:
+    """
+    Bounded LRU cache with per-entry TTL for CEP lookups.
+
+    Successful lookups are kept for `ttl` seconds. Errors listed in `negative_errors`
+    (e.g. "CEP not found") are remembered for the shorter `negative_ttl`. Concurrent
+    lookups for the same key share a single upstream call.
+    """
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float,
+                 negative_errors: Tuple[Type[Exception], ...] = ()):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_errors = negative_errors
+        self._entries: "OrderedDict[str, Tuple[float, Any, Optional[Exception]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the cached value for `key`, or calls `fetch` once and caches its outcome.
+
+        Args:
+            key (str): The cache key.
+            fetch (Callable[[], Awaitable[Any]]): Coroutine factory that loads the value on a miss.
+
+        Returns:
+            Any: The cached or freshly fetched value.
+
+        Raises:
+            Exception: The cached negative error, or whatever `fetch` raised.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value, error = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if error is not None:
+                    self.negative_hits += 1
+                    # raise a fresh instance so tracebacks don't pile up on the cached one
+                    raise type(error)(*error.args)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.expirations += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._inflight[key] = task
+        # shield so a cancelled caller does not cancel the lookup shared with other callers
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except self.negative_errors as error:
+            self._store(key, None, error, self.negative_ttl)
+            raise
+        else:
+            self._store(key, value, None, self.ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: str, value: Any, error: Optional[Exception], ttl: float) -> None:
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value, error)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drops every cached entry. Counters are kept.
+        """
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters, used to size `max_size` and the TTLs.
+
+        Returns:
+            dict: Current size and hit/miss/eviction counters.
+        """
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'inflight': len(self._inflight),
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_ratio': round((self.hits + self.negative_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
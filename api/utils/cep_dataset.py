@@ -0,0 +1,223 @@
+import os
+import csv
+import sys
+import json
+import mmap
+import logging
+import struct
+import argparse
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CEP_DATASET_PATH = os.getenv("CEP_DATASET_PATH", "")
+CEP_DATASET_FALLBACK = os.getenv("CEP_DATASET_FALLBACK", "true").lower() == "true"
+
+MAGIC = b"CEPDB\x00\x00\x01"
+HEADER = struct.Struct("<8sII")
+# cep, state, city, neighborhood, road. Text columns are UTF-8, NUL padded.
+RECORD = struct.Struct("<I2s100s100s100s")
+KEY = struct.Struct("<I")
+MAX_CEP = 99999999
+
+logger = logging.getLogger(__name__)
+
+FIELD_ALIASES = {
+    'cep': ('cep',),
+    'uf': ('uf', 'state'),
+    'localidade': ('localidade', 'city'),
+    'bairro': ('bairro', 'neighborhood'),
+    'logradouro': ('logradouro', 'road', 'street'),
+}
+
+
+def _encode(value: Optional[str], width: int) -> bytes:
+    encoded = (value or '').encode('utf-8')[:width]
+    # drop a multi-byte character cut in half by the truncation
+    return encoded.decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _decode(value: bytes) -> str:
+    return value.rstrip(b'\x00').decode('utf-8')
+
+
+class CepDataset:
+    """
+    Read-only, memory-mapped CEP dataset.
+
+    The file holds fixed-width records sorted by CEP, so a lookup is a binary search over the
+    mapping. Every worker process maps the same file and shares the OS page cache instead of
+    holding its own copy.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"CEP dataset {path} is empty")
+
+        magic, self.count, record_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a CEP dataset file")
+        if len(self._mmap) < HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f"CEP dataset {path} is truncated")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, value: Union[str, int]) -> Optional[dict]:
+        """
+        Finds the address for a CEP.
+
+        Args:
+            value (Union[str, int]): The CEP to look up.
+
+        Returns:
+            Optional[dict]: Address data in the ViaCEP format, or None if the CEP is not in the dataset.
+        """
+        try:
+            key = int(str(value).replace('-', ''))
+        except ValueError:
+            return None
+
+        low, high = 0, self.count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            (current,) = KEY.unpack_from(self._mmap, offset)
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle - 1
+            else:
+                _, state, city, neighborhood, road = RECORD.unpack_from(self._mmap, offset)
+                cep = f"{key:08d}"
+                return {
+                    'cep': f"{cep[:5]}-{cep[5:]}",
+                    'uf': _decode(state),
+                    'localidade': _decode(city),
+                    'bairro': _decode(neighborhood),
+                    'logradouro': _decode(road),
+                }
+        return None
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+
+def build_dataset(records: Iterable[Dict[str, str]], output_path: str) -> int:
+    """
+    Writes a CEP dataset file from address records.
+
+    The file is written next to `output_path` and then atomically renamed, so workers that
+    already mapped the previous version keep reading it until they reopen.
+
+    Args:
+        records (Iterable[Dict[str, str]]): Records with a CEP and ViaCEP or model field names.
+        output_path (str): Where to write the dataset.
+
+    Returns:
+        int: Number of records written. Duplicate CEPs keep the last record; records whose CEP
+        is not a number of up to 8 digits are skipped and counted in a warning.
+    """
+    rows: Dict[int, bytes] = {}
+    skipped = 0
+    for record in records:
+        fields = {
+            name: next((record[alias] for alias in aliases if record.get(alias) not in (None, '')), None)
+            for name, aliases in FIELD_ALIASES.items()
+        }
+        if fields['cep'] is None:
+            continue
+        raw_cep = str(fields['cep']).replace('-', '').strip()
+        if not (raw_cep.isascii() and raw_cep.isdigit()) or int(raw_cep) > MAX_CEP:
+            skipped += 1
+            logger.debug("Skipping record with malformed CEP %r", fields['cep'])
+            continue
+        cep = int(raw_cep)
+        rows[cep] = RECORD.pack(
+            cep,
+            _encode(fields['uf'], 2),
+            _encode(fields['localidade'], 100),
+            _encode(fields['bairro'], 100),
+            _encode(fields['logradouro'], 100),
+        )
+
+    if skipped:
+        logger.warning("Skipped %d records with a malformed CEP", skipped)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as output:
+        output.write(HEADER.pack(MAGIC, len(rows), RECORD.size))
+        for cep in sorted(rows):
+            output.write(rows[cep])
+    os.replace(tmp_path, output_path)
+    return len(rows)
+
+
+def read_records(input_path: str, input_format: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """
+    Reads a CEP dump as CSV (with a header row), a JSON array, or newline-delimited JSON.
+
+    Args:
+        input_path (str): The dump to read.
+        input_format (Optional[str]): 'csv' or 'json'. Guessed from the extension when omitted.
+
+    Yields:
+        Dict[str, str]: One record per CEP.
+    """
+    input_format = input_format or ('csv' if input_path.lower().endswith('.csv') else 'json')
+    with open(input_path, encoding='utf-8') as source:
+        if input_format == 'csv':
+            yield from csv.DictReader(source)
+            return
+
+        first = source.read(1)
+        while first.isspace():
+            first = source.read(1)
+        source.seek(0)
+        if first == '[':
+            yield from json.load(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+_dataset: Optional[CepDataset] = None
+
+
+def get_cep_dataset() -> Optional[CepDataset]:
+    """
+    Returns the dataset configured by CEP_DATASET_PATH, opening it on first use in this process.
+
+    Returns:
+        Optional[CepDataset]: The dataset, or None if offline resolution is not configured.
+    """
+    global _dataset
+    if _dataset is None and CEP_DATASET_PATH:
+        _dataset = CepDataset(CEP_DATASET_PATH)
+    return _dataset
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a memory-mapped CEP dataset from a CSV or JSON dump.")
+    parser.add_argument('input', help="CSV with a header row, JSON array or NDJSON file")
+    parser.add_argument('output', help="Path of the dataset file to write")
+    parser.add_argument('--format', choices=('csv', 'json'), help="Input format, guessed from the extension by default")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    total = build_dataset(read_records(args.input, args.format), args.output)
+    print(f"Wrote {total} CEPs to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
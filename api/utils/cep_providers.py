@@ -0,0 +1,251 @@
+import os
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Type
+
+import httpx
+from dotenv import load_dotenv
+
+from api.utils.circuit_breaker import CircuitBreaker
+
+load_dotenv()
+
+CEP_PROVIDERS = os.getenv("CEP_PROVIDERS", "viacep,brasilapi")
+CEP_VIACEP_URL = os.getenv("CEP_VIACEP_URL", "https://viacep.com.br/ws")
+CEP_BRASILAPI_URL = os.getenv("CEP_BRASILAPI_URL", "https://brasilapi.com.br/api/cep/v1")
+CEP_DEADLINE = float(os.getenv("CEP_DEADLINE", 5))
+CEP_PROVIDER_TIMEOUT = float(os.getenv("CEP_PROVIDER_TIMEOUT", 2))
+CEP_HEDGE_DELAY = float(os.getenv("CEP_HEDGE_DELAY", 0))
+CEP_BREAKER_FAILURES = int(os.getenv("CEP_BREAKER_FAILURES", 5))
+CEP_BREAKER_RESET = float(os.getenv("CEP_BREAKER_RESET", 30))
+
+logger = logging.getLogger(__name__)
+
+
+class CepNotFoundError(ValueError):
+    """
+    Raised when the CEP service answers that the CEP does not exist.
+    """
+
+
+class CepServiceError(ValueError):
+    """
+    Raised when the CEP service cannot be reached or answers with an unusable response.
+    """
+
+
+class CepProvider(ABC):
+    """
+    Base class for CEP lookup backends.
+
+    Subclasses implement `fetch` and return address data in the ViaCEP format
+    (`uf`, `localidade`, `bairro`, `logradouro`), raising CepNotFoundError or CepServiceError.
+    """
+    name = 'base'
+
+    def __init__(self, base_url: str, failure_threshold: int = CEP_BREAKER_FAILURES,
+                 reset_timeout: float = CEP_BREAKER_RESET):
+        self.base_url = base_url.rstrip('/')
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    @abstractmethod
+    async def fetch(self, cep: str, client: httpx.AsyncClient) -> dict:
+        """
+        Looks up a normalized 8-digit CEP.
+        """
+
+    async def _get_json(self, url: str, client: httpx.AsyncClient, not_found_status: Set[int]) -> dict:
+        try:
+            response = await client.get(url)
+        except httpx.HTTPError:
+            raise CepServiceError("Failed to access the CEP service")
+        if response.status_code in not_found_status:
+            raise CepNotFoundError("CEP Code Not Found")
+        if response.status_code != 200:
+            raise CepServiceError("Failed to access the CEP service")
+        try:
+            return response.json()
+        except ValueError:
+            raise CepServiceError("Failed to access the CEP service")
+
+
+class ViaCepProvider(CepProvider):
+    name = 'viacep'
+
+    async def fetch(self, cep: str, client: httpx.AsyncClient) -> dict:
+        # ViaCEP answers 400 for malformed CEPs and {"erro": true} for unknown ones
+        data = await self._get_json(f"{self.base_url}/{cep}/json/", client, {400})
+        if 'erro' in data:
+            raise CepNotFoundError("CEP Code Not Found")
+        return data
+
+
+class BrasilApiProvider(CepProvider):
+    name = 'brasilapi'
+
+    async def fetch(self, cep: str, client: httpx.AsyncClient) -> dict:
+        data = await self._get_json(f"{self.base_url}/{cep}", client, {400, 404})
+        return {
+            'cep': f"{cep[:5]}-{cep[5:]}",
+            'uf': data.get('state'),
+            'localidade': data.get('city'),
+            'bairro': data.get('neighborhood'),
+            'logradouro': data.get('street'),
+        }
+
+
+PROVIDERS: Dict[str, Type[CepProvider]] = {
+    ViaCepProvider.name: ViaCepProvider,
+    BrasilApiProvider.name: BrasilApiProvider,
+}
+
+PROVIDER_URLS: Dict[str, str] = {
+    ViaCepProvider.name: CEP_VIACEP_URL,
+    BrasilApiProvider.name: CEP_BRASILAPI_URL,
+}
+
+
+def register_provider(provider_class: Type[CepProvider], base_url: str) -> None:
+    """
+    Makes a provider selectable by name in CEP_PROVIDERS.
+
+    Args:
+        provider_class (Type[CepProvider]): The provider implementation.
+        base_url (str): The default base URL for the provider.
+    """
+    PROVIDERS[provider_class.name] = provider_class
+    PROVIDER_URLS[provider_class.name] = base_url
+
+
+def build_providers(names: str = CEP_PROVIDERS) -> List[CepProvider]:
+    """
+    Instantiates the providers listed in a comma-separated string, keeping their order.
+
+    Args:
+        names (str): Provider names, e.g. "viacep,brasilapi".
+
+    Returns:
+        List[CepProvider]: The providers, in priority order.
+
+    Raises:
+        ValueError: If a name is not a registered provider.
+    """
+    providers = []
+    for name in (name.strip() for name in names.split(',')):
+        if not name:
+            continue
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown CEP provider: {name}")
+        providers.append(PROVIDERS[name](PROVIDER_URLS[name]))
+    return providers
+
+
+class CepResolver:
+    """
+    Resolves a CEP through an ordered list of providers.
+
+    Each provider call is bounded by `provider_timeout` and guarded by the provider's circuit
+    breaker, so an unhealthy provider is skipped without waiting. A provider that fails hands
+    over to the next one. With `hedge_delay` set, the next provider is also started when the
+    current one has not answered within that delay, and the first answer wins. The whole
+    resolution is bounded by `deadline`.
+    """
+    def __init__(self, providers: List[CepProvider], deadline: float = CEP_DEADLINE,
+                 provider_timeout: float = CEP_PROVIDER_TIMEOUT, hedge_delay: float = CEP_HEDGE_DELAY):
+        self.providers = providers
+        self.deadline = deadline
+        self.provider_timeout = provider_timeout
+        self.hedge_delay = hedge_delay
+        self.hedged = 0
+        self.deadline_exceeded = 0
+
+    async def resolve(self, cep: str, client: httpx.AsyncClient) -> dict:
+        """
+        Resolves a normalized CEP.
+
+        Args:
+            cep (str): The 8-digit CEP.
+            client (httpx.AsyncClient): The HTTP client used by the providers.
+
+        Returns:
+            dict: Address data in the ViaCEP format.
+
+        Raises:
+            CepNotFoundError: If a provider answered that the CEP does not exist.
+            CepServiceError: If no provider could answer before the deadline.
+        """
+        try:
+            return await asyncio.wait_for(self._resolve(cep, client), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            raise CepServiceError("CEP service timed out")
+
+    async def _resolve(self, cep: str, client: httpx.AsyncClient) -> dict:
+        remaining = iter(self.providers)
+        pending: Set[asyncio.Task] = set()
+        last_error: Optional[Exception] = None
+
+        def start_next() -> bool:
+            for provider in remaining:
+                if provider.breaker.allow_request():
+                    pending.add(asyncio.ensure_future(self._call(provider, cep, client)))
+                    return True
+            return False
+
+        if not start_next():
+            raise CepServiceError("CEP service unavailable")
+
+        try:
+            while pending:
+                hedge = self.hedge_delay if self.hedge_delay > 0 else None
+                done, _ = await asyncio.wait(pending, timeout=hedge, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if start_next():
+                        self.hedged += 1
+                    else:
+                        # nothing left to hedge with, wait for what is in flight
+                        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        return task.result()
+                    except CepServiceError as error:
+                        last_error = error
+
+                if not pending:
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error or CepServiceError("CEP service unavailable")
+
+    async def _call(self, provider: CepProvider, cep: str, client: httpx.AsyncClient) -> dict:
+        try:
+            data = await asyncio.wait_for(provider.fetch(cep, client), timeout=self.provider_timeout)
+        except CepNotFoundError:
+            # a definitive answer: the provider itself is healthy
+            provider.breaker.record_success()
+            raise
+        except (CepServiceError, asyncio.TimeoutError):
+            provider.breaker.record_failure()
+            raise CepServiceError("Failed to access the CEP service")
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            raise
+        except Exception as error:
+            # e.g. a provider that changed its payload: count it, and let the next provider answer
+            logger.exception("CEP provider %s failed unexpectedly", provider.name)
+            provider.breaker.record_failure()
+            raise CepServiceError("Failed to access the CEP service") from error
+        provider.breaker.record_success()
+        return data
+
+    def stats(self) -> dict:
+        return {
+            'hedged': self.hedged,
+            'deadline_exceeded': self.deadline_exceeded,
+            'providers': {provider.name: provider.breaker.stats() for provider in self.providers},
+        }
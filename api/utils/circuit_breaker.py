@@ -0,0 +1,73 @@
+import time
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and rejects calls for
+    `reset_timeout` seconds. It then lets a single trial call through (half-open): a success
+    closes it again, a failure re-opens it.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.failure_threshold <= 0 or self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Checks whether a call may go through. Claims the trial slot when half-open.
+
+        Returns:
+            bool: False if the call should fail fast.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        self.failures += 1
+        if self.failures >= self.failure_threshold > 0:
+            if self.failures == self.failure_threshold:
+                self.times_opened += 1
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """
+        Gives back the trial slot of a call that ended without an outcome (e.g. was cancelled).
+        """
+        self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'rejected': self.rejected,
+            'times_opened': self.times_opened,
+        }
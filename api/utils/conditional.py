@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict
+
+from fastapi import Request, Response, status
+
+
+def http_date(value: datetime) -> str:
+    """
+    Formats a datetime as an HTTP date, e.g. 'Sun, 18 Oct 2026 12:00:00 GMT'.
+    """
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    """
+    Builds the ETag and Last-Modified headers of a response. `no-cache` lets clients keep
+    the response but makes them revalidate it on every use.
+    """
+    return {'ETag': etag, 'Last-Modified': http_date(last_modified), 'Cache-Control': 'no-cache'}
+
+
+def is_conditional(request: Request) -> bool:
+    """
+    Checks whether the client sent validators of a copy it already holds.
+    """
+    return 'if-none-match' in request.headers or 'if-modified-since' in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """
+    Evaluates If-None-Match, or If-Modified-Since when there is no If-None-Match, against
+    the current validators of a resource.
+
+    Args:
+        request (Request): The request.
+        etag (str): The current strong ETag, quoted.
+        last_modified (datetime): When the resource last changed.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 can be sent.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        # If-None-Match uses the weak comparison
+        return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have a one second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(etag: str, last_modified: datetime) -> Response:
+    """
+    Builds a 304 Not Modified response carrying the current validators.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, last_modified))
@@ -1,9 +1,125 @@
-import bcrypt
+import os
+import time
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
 
-def has_password(password):
-    password_bytes = password.encode('utf-8')
-    has_password = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
-    return has_password.decode('utf-8')
+from dotenv import load_dotenv
 
-def verify_password(plain_password, hashed_password):
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
\ No newline at end of file
+from api.utils.password_policy import PasswordHashPolicy, password_policy
+
+load_dotenv()
+
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+
+def has_password(password, policy: Optional[PasswordHashPolicy] = None):
+    return (policy or password_policy).hash(password)
+
+def verify_password(plain_password, hashed_password, policy: Optional[PasswordHashPolicy] = None):
+    return (policy or password_policy).verify(plain_password, hashed_password)
+
+
+class HashPoolStats:
+    """
+    Counters for the password hashing pool. Queue depth is the number of submitted jobs
+    beyond what the workers can run at once.
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'executor': PASSWORD_HASH_EXECUTOR,
+            'workers': self.workers,
+            'in_flight': self.in_flight,
+            'queue_depth': max(0, self.in_flight - self.workers),
+            'max_queue_depth': max(0, self.max_in_flight - self.workers),
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_latency_ms': round(self.total_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+        }
+
+
+hash_pool_stats = HashPoolStats(PASSWORD_HASH_WORKERS)
+_executor: Optional[Executor] = None
+
+
+def get_hash_executor() -> Executor:
+    """
+    Returns the dedicated pool for password hashing, creating it on first use.
+
+    bcrypt releases the GIL, so a thread pool is usually enough; set
+    PASSWORD_HASH_EXECUTOR=process to use worker processes instead.
+
+    Returns:
+        Executor: The hashing pool.
+    """
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == 'process':
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
+    return _executor
+
+
+def shutdown_hash_executor() -> None:
+    """
+    Stops the hashing pool. Called on application shutdown.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def _run_in_hash_pool(function, *args):
+    loop = asyncio.get_running_loop()
+    hash_pool_stats.in_flight += 1
+    hash_pool_stats.max_in_flight = max(hash_pool_stats.max_in_flight, hash_pool_stats.in_flight)
+    started = time.perf_counter()
+    try:
+        result = await loop.run_in_executor(get_hash_executor(), function, *args)
+    except Exception:
+        hash_pool_stats.failed += 1
+        raise
+    else:
+        hash_pool_stats.completed += 1
+        hash_pool_stats.total_seconds += time.perf_counter() - started
+        return result
+    finally:
+        hash_pool_stats.in_flight -= 1
+
+
+async def has_password_async(password: str) -> str:
+    """
+    Hashes a password with the current policy on the hashing pool, keeping the event loop free.
+
+    Args:
+        password (str): The plain password.
+
+    Returns:
+        str: The encoded hash.
+    """
+    # the policy is passed along so process workers use the calibrated one
+    return await _run_in_hash_pool(has_password, password, password_policy)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Checks a password against its hash on the hashing pool, keeping the event loop free.
+
+    Args:
+        plain_password (str): The password to check.
+        hashed_password (str): The stored hash, of any supported scheme.
+
+    Returns:
+        bool: True if the password matches.
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password, password_policy)
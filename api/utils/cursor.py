@@ -0,0 +1,42 @@
+import json
+import base64
+from typing import List
+
+
+def encode_cursor(*values) -> str:
+    """
+    Packs the sort key of the last row of a page into an opaque, URL-safe cursor.
+
+    Args:
+        *values: The sort key values, in ORDER BY order.
+
+    Returns:
+        str: The cursor.
+    """
+    payload = json.dumps([str(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """
+    Unpacks a cursor made by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor received from the client.
+        size (int): Number of values the cursor must hold.
+
+    Returns:
+        List[str]: The sort key values, as strings.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (ValueError, TypeError) as error:
+        raise ValueError("Malformed cursor") from error
+
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise ValueError("Malformed cursor")
+    return values
@@ -0,0 +1,72 @@
+import os
+import importlib.util
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 5))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", 2))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def http2_available() -> bool:
+    """
+    Checks whether HTTP/2 can be negotiated, which requires the optional `h2` package.
+
+    Returns:
+        bool: True if HTTP/2 is enabled and the `h2` package is installed.
+    """
+    return HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Builds an AsyncClient with keep-alive connection pooling and the configured limits and timeouts.
+
+    Returns:
+        httpx.AsyncClient: A new client. The caller is responsible for closing it.
+    """
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        HTTP_READ_TIMEOUT,
+        connect=HTTP_CONNECT_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2_available())
+
+
+async def close_http_client() -> None:
+    """
+    Closes the shared client and its pooled connections. Called on application shutdown.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client, creating it on first use. The application lifespan opens it on
+    startup; without the lifespan (e.g. through ASGITransport in tests) the first request does.
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
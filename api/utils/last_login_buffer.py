@@ -0,0 +1,167 @@
+import os
+import asyncio
+import logging
+from uuid import UUID
+from datetime import datetime
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import update, values, column, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.types import DateTime
+
+from api.database.connection import async_session
+from api.models.User import User
+from api.utils.user_version_cache import user_version_cache
+
+load_dotenv()
+
+LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", 5))
+LAST_LOGIN_FLUSH_SIZE = int(os.getenv("LAST_LOGIN_FLUSH_SIZE", 500))
+FLUSH_CHUNK_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for `users.date_login`.
+
+    Logins are collected in memory and written as one bulk UPDATE, either every
+    `flush_interval` seconds or as soon as `flush_size` users are pending, and once more on
+    shutdown. Until then `get` returns the buffered value so reads stay up to date in this process.
+    """
+    def __init__(self, session_factory=async_session, flush_interval: float = LAST_LOGIN_FLUSH_INTERVAL,
+                 flush_size: int = LAST_LOGIN_FLUSH_SIZE):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._pending: Dict[UUID, datetime] = {}
+        self._flushing: Dict[UUID, datetime] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._size_flush: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.failed_flushes = 0
+
+    def record(self, user_id: UUID, date_login: datetime) -> None:
+        """
+        Buffers a login, keeping only the latest timestamp per user.
+
+        Args:
+            user_id (UUID): The user who logged in.
+            date_login (datetime): When they logged in.
+        """
+        current = self._pending.get(user_id)
+        if current is None or date_login > current:
+            self._pending[user_id] = date_login
+        if len(self._pending) >= self.flush_size and (self._size_flush is None or self._size_flush.done()):
+            self._size_flush = asyncio.ensure_future(self.flush())
+
+    def get(self, user_id: UUID) -> Optional[datetime]:
+        """
+        Returns the buffered login of a user that has not reached the database yet.
+
+        Args:
+            user_id (UUID): The user.
+
+        Returns:
+            Optional[datetime]: The pending timestamp, or None.
+        """
+        return self._pending.get(user_id) or self._flushing.get(user_id)
+
+    async def flush(self) -> int:
+        """
+        Writes every pending login in a single UPDATE ... FROM (VALUES ...) statement.
+        If the write fails or is cancelled the logins go back into the buffer for the next flush.
+
+        Returns:
+            int: Number of users written.
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+            self._flushing, self._pending = self._pending, {}
+            items = list(self._flushing.items())
+            try:
+                async with self.session_factory() as session:
+                    # chunked to stay under the bind parameter limit if the buffer grew during an outage
+                    for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+                        await session.execute(self._update_statement(items[start:start + FLUSH_CHUNK_SIZE]))
+                    await session.commit()
+            except asyncio.CancelledError:
+                # e.g. stop() cancelling the periodic flush: keep the logins for the final flush
+                self._requeue()
+                raise
+            except Exception:
+                self.failed_flushes += 1
+                logger.exception("Failed to flush %d last-login timestamps", len(self._flushing))
+                self._requeue()
+                return 0
+
+            written = len(self._flushing)
+            # dropped together with the pending logins, so no version without either is left behind
+            user_version_cache.invalidate(self._flushing)
+            self._flushing = {}
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    def _requeue(self) -> None:
+        for user_id, date_login in self._flushing.items():
+            current = self._pending.get(user_id)
+            if current is None or date_login > current:
+                self._pending[user_id] = date_login
+        self._flushing = {}
+
+    @staticmethod
+    def _update_statement(items: list):
+        rows = values(
+            column('id', PG_UUID(as_uuid=True)),
+            column('date_login', DateTime(timezone=True)),
+            name='pending_logins',
+        ).data(items)
+        # greatest() keeps a newer login already written by another worker
+        return (
+            update(User)
+            .where(User.id == rows.c.id)
+            .values(date_login=func.greatest(User.date_login, rows.c.date_login))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """
+        Starts the periodic flush. Called on application startup.
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the periodic flush and writes what is still pending. Called on application shutdown.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            'pending': len(self._pending),
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'failed_flushes': self.failed_flushes,
+        }
+
+
+last_login_buffer = LastLoginBuffer()
@@ -0,0 +1,115 @@
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOGIN_MAX_ATTEMPTS_PER_EMAIL = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_EMAIL", 5))
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", 50))
+LOGIN_WINDOW_SECONDS = float(os.getenv("LOGIN_WINDOW_SECONDS", 300))
+LOGIN_LOCKOUT_SECONDS = float(os.getenv("LOGIN_LOCKOUT_SECONDS", 900))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", 100000))
+
+
+class LoginThrottle:
+    """
+    In-memory sliding-window tracker of failed logins, keyed by email and by client IP.
+
+    A key that collects `max_attempts` failures within `window` seconds is locked out for
+    `lockout` seconds. Locked-out attempts are rejected before any database query or
+    password check runs. The number of tracked keys is bounded, oldest first out.
+    """
+    def __init__(self, max_per_email: int = LOGIN_MAX_ATTEMPTS_PER_EMAIL,
+                 max_per_ip: int = LOGIN_MAX_ATTEMPTS_PER_IP,
+                 window: float = LOGIN_WINDOW_SECONDS, lockout: float = LOGIN_LOCKOUT_SECONDS,
+                 max_keys: int = LOGIN_THROTTLE_MAX_KEYS):
+        self.max_per_email = max_per_email
+        self.max_per_ip = max_per_ip
+        self.window = window
+        self.lockout = lockout
+        self.max_keys = max_keys
+        self._failures: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._locked_until: Dict[str, float] = {}
+        self.rejected_email = 0
+        self.rejected_ip = 0
+        self.lockouts = 0
+
+    @staticmethod
+    def _keys(email: str, client_ip: Optional[str]) -> Dict[str, str]:
+        keys = {'email': f"email:{email.strip().lower()}"}
+        if client_ip:
+            keys['ip'] = f"ip:{client_ip}"
+        return keys
+
+    def check(self, email: str, client_ip: Optional[str] = None) -> Optional[float]:
+        """
+        Checks whether a login attempt may proceed.
+
+        Args:
+            email (str): The email being logged into.
+            client_ip (Optional[str]): The address the attempt comes from.
+
+        Returns:
+            Optional[float]: Seconds until the lockout ends if the attempt must be rejected, otherwise None.
+        """
+        now = time.monotonic()
+        for kind, key in self._keys(email, client_ip).items():
+            locked_until = self._locked_until.get(key)
+            if locked_until is None:
+                continue
+            if locked_until <= now:
+                del self._locked_until[key]
+                continue
+            if kind == 'email':
+                self.rejected_email += 1
+            else:
+                self.rejected_ip += 1
+            return locked_until - now
+        return None
+
+    def record_failure(self, email: str, client_ip: Optional[str] = None) -> None:
+        """
+        Records a failed attempt and locks out keys that went over their limit.
+        """
+        now = time.monotonic()
+        limits = {'email': self.max_per_email, 'ip': self.max_per_ip}
+        for kind, key in self._keys(email, client_ip).items():
+            attempts = self._failures.get(key)
+            if attempts is None:
+                attempts = self._failures[key] = deque()
+                while len(self._failures) > self.max_keys:
+                    evicted, _ = self._failures.popitem(last=False)
+                    self._locked_until.pop(evicted, None)
+            else:
+                self._failures.move_to_end(key)
+
+            attempts.append(now)
+            while attempts and attempts[0] <= now - self.window:
+                attempts.popleft()
+            if len(attempts) >= limits[kind]:
+                self._locked_until[key] = now + self.lockout
+                attempts.clear()
+                self.lockouts += 1
+
+    def record_success(self, email: str) -> None:
+        """
+        Forgets the failures of an email after a successful login. IP failures are kept.
+        """
+        key = self._keys(email, None)['email']
+        self._failures.pop(key, None)
+        self._locked_until.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            'tracked_keys': len(self._failures),
+            'locked_keys': len(self._locked_until),
+            'lockouts': self.lockouts,
+            'rejected_by_email': self.rejected_email,
+            'rejected_by_ip': self.rejected_ip,
+        }
+
+
+login_throttle = LoginThrottle()
@@ -0,0 +1,165 @@
+import os
+import time
+from typing import Optional
+
+import bcrypt
+from dotenv import load_dotenv
+
+try:
+    from argon2 import PasswordHasher, extract_parameters
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:  # argon2-cffi is optional, only needed for the argon2 scheme
+    PasswordHasher = None
+
+load_dotenv()
+
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", 12))
+PASSWORD_BCRYPT_MIN_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_MIN_ROUNDS", 10))
+PASSWORD_BCRYPT_MAX_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_MAX_ROUNDS", 15))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 3))
+PASSWORD_ARGON2_MEMORY_KIB = int(os.getenv("PASSWORD_ARGON2_MEMORY_KIB", 65536))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 4))
+PASSWORD_TARGET_MS = float(os.getenv("PASSWORD_TARGET_MS", 0))
+
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+ARGON2_PREFIX = '$argon2'
+
+
+class PasswordHashPolicy:
+    """
+    Password hashing policy: which scheme new hashes use and how expensive they are.
+
+    Hashes from any supported scheme can be verified, so switching scheme or work factor
+    does not lock anyone out; `needs_rehash` tells which stored hashes are weaker than the policy.
+    """
+    def __init__(self, scheme: str = PASSWORD_SCHEME, bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+                 argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+                 argon2_memory_kib: int = PASSWORD_ARGON2_MEMORY_KIB,
+                 argon2_parallelism: int = PASSWORD_ARGON2_PARALLELISM):
+        if scheme not in ('bcrypt', 'argon2'):
+            raise ValueError(f"Unknown password hashing scheme: {scheme}")
+        if scheme == 'argon2' and PasswordHasher is None:
+            raise RuntimeError("The argon2 password scheme requires the argon2-cffi package")
+        self.scheme = scheme
+        self.bcrypt_rounds = bcrypt_rounds
+        self.argon2_time_cost = argon2_time_cost
+        self.argon2_memory_kib = argon2_memory_kib
+        self.argon2_parallelism = argon2_parallelism
+
+    def _argon2(self) -> "PasswordHasher":
+        if PasswordHasher is None:
+            raise RuntimeError("Verifying argon2 hashes requires the argon2-cffi package")
+        return PasswordHasher(time_cost=self.argon2_time_cost, memory_cost=self.argon2_memory_kib,
+                              parallelism=self.argon2_parallelism)
+
+    def hash(self, password: str) -> str:
+        """
+        Hashes a password with the current scheme and work factor.
+
+        Args:
+            password (str): The plain password.
+
+        Returns:
+            str: The encoded hash.
+        """
+        if self.scheme == 'argon2':
+            return self._argon2().hash(password)
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.bcrypt_rounds)).decode('utf-8')
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Checks a password against a hash of any supported scheme.
+
+        Args:
+            password (str): The password to check.
+            hashed_password (str): The stored hash.
+
+        Returns:
+            bool: True if the password matches.
+        """
+        if hashed_password.startswith(ARGON2_PREFIX):
+            try:
+                return self._argon2().verify(hashed_password, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Checks whether a stored hash was made with another scheme, or a lower work factor, than the policy's.
+
+        Only a cheaper hash is replaced: workers calibrated on different hosts or at different
+        times may settle on different costs, and rehashing downwards would make logins flip a
+        hash back and forth between them.
+
+        Args:
+            hashed_password (str): The stored hash.
+
+        Returns:
+            bool: True if the hash should be replaced on the next successful login.
+        """
+        if self.scheme == 'argon2':
+            if not hashed_password.startswith(ARGON2_PREFIX):
+                return True
+            try:
+                parameters = extract_parameters(hashed_password)
+            except InvalidHashError:
+                return True
+            return (parameters.time_cost < self.argon2_time_cost
+                    or parameters.memory_cost < self.argon2_memory_kib)
+        if not hashed_password.startswith(BCRYPT_PREFIXES):
+            return True
+        return int(hashed_password[4:6]) < self.bcrypt_rounds
+
+    def calibrate(self, target_ms: float) -> None:
+        """
+        Benchmarks this host and picks the most expensive work factor that still hashes
+        within `target_ms`. bcrypt rounds stay within PASSWORD_BCRYPT_MIN_ROUNDS and
+        PASSWORD_BCRYPT_MAX_ROUNDS; for argon2 the memory cost is kept and the time cost tuned.
+
+        Args:
+            target_ms (float): Latency budget for one hash, in milliseconds.
+        """
+        if self.scheme == 'argon2':
+            self.argon2_time_cost = 1
+            while self._time_hash() * 1000 * (self.argon2_time_cost + 1) / self.argon2_time_cost <= target_ms:
+                self.argon2_time_cost += 1
+            return
+
+        # each extra bcrypt round doubles the cost, so one measurement is enough to extrapolate
+        self.bcrypt_rounds = PASSWORD_BCRYPT_MIN_ROUNDS
+        elapsed_ms = self._time_hash() * 1000
+        while self.bcrypt_rounds < PASSWORD_BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= target_ms:
+            self.bcrypt_rounds += 1
+            elapsed_ms *= 2
+
+    def _time_hash(self) -> float:
+        started = time.perf_counter()
+        self.hash('calibration-password')
+        return time.perf_counter() - started
+
+    def describe(self) -> dict:
+        if self.scheme == 'argon2':
+            return {
+                'scheme': self.scheme,
+                'time_cost': self.argon2_time_cost,
+                'memory_kib': self.argon2_memory_kib,
+                'parallelism': self.argon2_parallelism,
+            }
+        return {'scheme': self.scheme, 'rounds': self.bcrypt_rounds}
+
+
+password_policy = PasswordHashPolicy()
+
+
+def calibrate_password_policy(target_ms: Optional[float] = None) -> None:
+    """
+    Calibrates the shared policy when a latency budget is configured (PASSWORD_TARGET_MS).
+
+    Args:
+        target_ms (Optional[float]): Overrides PASSWORD_TARGET_MS.
+    """
+    target_ms = target_ms if target_ms is not None else PASSWORD_TARGET_MS
+    if target_ms > 0:
+        password_policy.calibrate(target_ms)
@@ -1,18 +1,85 @@
 import os
-import jwt
+import time
+import hashlib
 from uuid import UUID
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Union
+from typing import Optional, Dict, Tuple, Union
 from fastapi import HTTPException
 from dotenv import load_dotenv
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
 
 load_dotenv()
 
-#SECRET_KEY = os.getenv("123")
-#ALGORITHM = os.getenv("ALGORITHM", "HS256")
-SECRET_KEY = "123"
-ALGORITHM = "HS256"
+SECRET_KEY = os.getenv("SECRET_KEY", "123")
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+
+
+class TokenVerifier:
+    """
+    Verifies JWTs and remembers the ones already verified.
+
+    Verified payloads are cached by the SHA-256 digest of the token until the token's own
+    `exp`, so repeated requests with the same token skip the signature check and JSON decoding.
+    Only valid tokens are cached, and the cache is bounded (least recently used out).
+    """
+    def __init__(self, secret_key: str = SECRET_KEY, algorithm: str = ALGORITHM,
+                 max_size: int = TOKEN_CACHE_MAX_SIZE):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.max_size = max_size
+        self._cache: "OrderedDict[bytes, Tuple[float, Dict[str, Union[str, int]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> Dict[str, Union[str, int]]:
+        """
+        Returns the payload of a valid token.
+
+        Args:
+            token (str): The encoded JWT.
+
+        Returns:
+            Dict[str, Union[str, int]]: The decoded payload.
+
+        Raises:
+            ExpiredSignatureError: If the token has expired.
+            JWTClaimsError: If the token claims are invalid.
+            JWTError: If the token is invalid.
+        """
+        digest = hashlib.sha256(token.encode('utf-8')).digest()
+        entry = self._cache.get(digest)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.time():
+                self._cache.move_to_end(digest)
+                self.hits += 1
+                return dict(payload)
+            del self._cache[digest]
+
+        self.misses += 1
+        payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        if isinstance(payload.get('exp'), (int, float)) and self.max_size > 0:
+            self._cache[digest] = (payload['exp'], payload)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return dict(payload)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_verifier = TokenVerifier()
 
 def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -45,13 +112,12 @@ def verify_token(token: str) -> Optional[Dict[str, Union[str, int]]]:
         HTTPException: If the token is invalid, expired, or has invalid claims.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
+        return token_verifier.verify(token)
+    except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTClaimsError:
+    except JWTClaimsError:
         raise HTTPException(status_code=401, detail="Invalid token claims")
-    except jwt.PyJWTError:
+    except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
@@ -0,0 +1,63 @@
+import os
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+USER_COUNT_CACHE_TTL = float(os.getenv("USER_COUNT_CACHE_TTL", 60))
+
+
+class UserCountCache:
+    """
+    Per-process counter of users by `active` flag, refreshed at most every `ttl` seconds.
+
+    Totals served from it can be up to `ttl` seconds old, which is enough for pagination
+    totals and avoids a COUNT(*) on every list request.
+    """
+    def __init__(self, ttl: float = USER_COUNT_CACHE_TTL):
+        self.ttl = ttl
+        self._counts: Dict[bool, int] = {}
+        self._refreshed_at: Optional[float] = None
+        self.hits = 0
+        self.refreshes = 0
+
+    def get(self, active: Optional[bool] = None) -> Optional[int]:
+        """
+        Returns the cached number of users, or None when the counter is stale.
+
+        Args:
+            active (Optional[bool]): Count only active (True) or inactive (False) users, None for all.
+
+        Returns:
+            Optional[int]: The count, or None if it has to be refreshed.
+        """
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.ttl:
+            return None
+        self.hits += 1
+        if active is None:
+            return sum(self._counts.values())
+        return self._counts.get(active, 0)
+
+    def update(self, counts: Dict[bool, int]) -> None:
+        """
+        Replaces the counts with freshly computed ones.
+
+        Args:
+            counts (Dict[bool, int]): Number of users per `active` value.
+        """
+        self._counts = dict(counts)
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+
+    def stats(self) -> dict:
+        return {
+            'ttl': self.ttl,
+            'age_seconds': round(time.monotonic() - self._refreshed_at, 3) if self._refreshed_at is not None else None,
+            'hits': self.hits,
+            'refreshes': self.refreshes,
+        }
+
+
+user_count_cache = UserCountCache()
@@ -0,0 +1,136 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from api.models.User import User
+from api.models.Address import Address
+
+load_dotenv()
+
+USER_VERSION_CACHE_TTL = float(os.getenv("USER_VERSION_CACHE_TTL", 5))
+USER_VERSION_CACHE_MAX_SIZE = int(os.getenv("USER_VERSION_CACHE_MAX_SIZE", 10000))
+
+WRITTEN_USERS_KEY = 'written_user_ids'
+
+
+class UserVersionCache:
+    """
+    Per-process LRU of user versions, so conditional GETs can answer 304 without a query.
+
+    Versions are tuples starting with the user id. Writes committed in this process drop the
+    user's entries through `invalidate`; a change made through another worker is seen once the
+    entry expires, at most `ttl` seconds later.
+    """
+    def __init__(self, ttl: float = USER_VERSION_CACHE_TTL, max_size: int = USER_VERSION_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, tuple]]" = OrderedDict()
+        self._keys_by_user: Dict[Hashable, Set[Hashable]] = {}
+        # bumped on every invalidation, so a version read before it is not stored after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        """
+        Returns the cached version for a lookup key, or None if it is missing or expired.
+
+        Args:
+            key (Hashable): The lookup, e.g. ('id', user_id, include).
+
+        Returns:
+            Optional[tuple]: The version stored with `set`.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, version: tuple, generation: Optional[int] = None) -> None:
+        """
+        Stores the version for a lookup key for `ttl` seconds.
+
+        Args:
+            key (Hashable): The lookup.
+            version (tuple): The version, as returned by the version query.
+            generation (Optional[int]): `generation` when the version was read. If the cache was
+                invalidated since, the version may predate that write and is not stored.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._discard(key)
+        self._entries[key] = (time.monotonic() + self.ttl, version)
+        self._keys_by_user.setdefault(version[0], set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, user_ids: Iterable[Hashable]) -> None:
+        """
+        Drops every cached version of the given users. Called once their writes are committed.
+
+        Args:
+            user_ids (Iterable[Hashable]): The users that were written.
+        """
+        self.generation += 1
+        for user_id in user_ids:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1][0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1][0]]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'invalidations': self.invalidations,
+        }
+
+
+user_version_cache = UserVersionCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_written_users(session, flush_context) -> None:
+    # new, dirty and deleted still hold the flushed objects here
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            session.info.setdefault(WRITTEN_USERS_KEY, set()).add(instance.id)
+        elif isinstance(instance, Address):
+            session.info.setdefault(WRITTEN_USERS_KEY, set()).add(instance.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_written_users(session) -> None:
+    user_ids = session.info.pop(WRITTEN_USERS_KEY, None)
+    if user_ids:
+        user_version_cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_written_users(session) -> None:
+    session.info.pop(WRITTEN_USERS_KEY, None)
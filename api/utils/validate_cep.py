@@ -1,11 +1,58 @@
+import os
+from typing import Optional, Union
+
 import httpx
+from dotenv import load_dotenv
+
+from api.utils.cep_cache import CepCache
+from api.utils.cep_dataset import get_cep_dataset, CEP_DATASET_FALLBACK
+from api.utils.cep_providers import CepResolver, CepNotFoundError, CepServiceError, build_providers
+from api.utils.http_client import get_http_client
+
+load_dotenv()
+
+CEP_CACHE_MAX_SIZE = int(os.getenv("CEP_CACHE_MAX_SIZE", 10000))
+CEP_CACHE_TTL = float(os.getenv("CEP_CACHE_TTL", 86400))
+CEP_CACHE_NEGATIVE_TTL = float(os.getenv("CEP_CACHE_NEGATIVE_TTL", 300))
+CEP_BATCH_CONCURRENCY = int(os.getenv("CEP_BATCH_CONCURRENCY", 20))
+
+cep_cache = CepCache(
+    max_size=CEP_CACHE_MAX_SIZE,
+    ttl=CEP_CACHE_TTL,
+    negative_ttl=CEP_CACHE_NEGATIVE_TTL,
+    negative_errors=(CepNotFoundError,),
+)
+
+cep_resolver = CepResolver(build_providers())
+
+
+def normalize_cep(value: Union[str, int]) -> str:
+    """
+    Normalizes a CEP to its 8-digit string form, restoring leading zeros lost by integer storage.
 
-async def validate_cep(value: str) -> dict:
+    Args:
+        value (Union[str, int]): The CEP, e.g. 1001000, "01001000" or "01001-000".
+
+    Returns:
+        str: The CEP as 8 digits.
     """
-    Validates and fetches address data from a given CEP (Postal Code) using the ViaCEP API.
+    return str(value).replace('-', '').strip().zfill(8)
+
+
+async def validate_cep(value: Union[str, int], client: Optional[httpx.AsyncClient] = None) -> dict:
+    """
+    Validates and fetches address data from a given CEP (Postal Code) using the configured CEP providers.
+
+    When CEP_DATASET_PATH is set, the CEP is first resolved from the local memory-mapped
+    dataset; unknown CEPs fall back to the network only if CEP_DATASET_FALLBACK is enabled.
+    Network lookups go through an in-process LRU/TTL cache: repeated CEPs are answered from
+    memory, "not found" answers are remembered for a shorter TTL, and concurrent lookups for
+    the same CEP share one upstream request. Upstream calls are bounded by CEP_DEADLINE and
+    fall through the providers in CEP_PROVIDERS, skipping those whose circuit breaker is open.
 
     Args:
-        value (str): The CEP code to be validated.
+        value (Union[str, int]): The CEP code to be validated.
+        client (Optional[httpx.AsyncClient]): Pooled HTTP client to use. Defaults to the shared application client.
 
     Returns:
         dict: A dictionary containing address data such as state, city, neighborhood, and road.
@@ -13,14 +60,16 @@ async def validate_cep(value: str) -> dict:
     Raises:
         ValueError: If the CEP code is not found or if there is a failure in accessing the CEP service.
     """
-    url = f"https://viacep.com.br/ws/{value}/json/"
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url)
-            response_data = response.json()
-            if 'erro' in response_data:
-                raise ValueError("CEP Code Not Found")
-        except httpx.RequestError:
-            raise ValueError("Failed to access the CEP service")    
-        
-        return response_data
\ No newline at end of file
+    cep = normalize_cep(value)
+
+    dataset = get_cep_dataset()
+    if dataset is not None:
+        data = dataset.lookup(cep)
+        if data is not None:
+            return data
+        if not CEP_DATASET_FALLBACK:
+            raise CepNotFoundError("CEP Code Not Found")
+
+    client = client or get_http_client()
+    data = await cep_cache.get_or_fetch(cep, lambda: cep_resolver.resolve(cep, client))
+    return dict(data)